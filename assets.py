@@ -0,0 +1,209 @@
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import abort, request, send_from_directory, url_for
+
+#----------------------------------------------------------------------------#
+# Static asset pipeline.
+#
+# build_assets() concatenates and minifies the bundles below, copies every
+# other file under static/ next to them with a content hash in its name,
+# rewrites url() references in the CSS to the hashed names and writes gzip
+# (and brotli, when installed) siblings plus a manifest. Templates ask for
+# files through asset_url() / asset_urls(), which read the manifest and fall
+# back to the plain /static files when it is missing or ASSETS_DEBUG is set.
+#----------------------------------------------------------------------------#
+
+BUNDLES = {
+    'css/app.css': ['css/bootstrap.min.css', 'css/font-awesome.css', 'css/layout.main.css',
+                    'css/main.css', 'css/main.responsive.css', 'css/main.quickfix.css'],
+    'js/app.js': ['js/libs/jquery-1.11.1.min.js', 'js/libs/bootstrap-3.1.1.min.js',
+                  'js/libs/moment.min.js', 'js/plugins.js', 'js/script.js']
+}
+
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+# Already compressed formats gain nothing from gzip/brotli
+COMPRESS = ('.css', '.js', '.svg', '.ttf', '.eot', '.otf', '.json', '.map', '.txt')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Missing from older mimetypes tables; looked up first so the system tables
+# are only read when an asset is actually served
+FONT_TYPES = {'.woff': 'font/woff', '.woff2': 'font/woff2', '.ttf': 'font/ttf',
+              '.otf': 'font/otf', '.eot': 'application/vnd.ms-fontobject'}
+
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/|\s+', re.S)
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+CSS_COLON = re.compile(r'\s*:\s*')
+CSS_BLOCK = re.compile(r'[{};]')
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def minify_css(text):
+    # Strings and /*! license */ comments are kept verbatim; other comments are
+    # dropped and whitespace collapsed
+    def token(match):
+        if match.group(1) or match.group(0).startswith('/*!'):
+            return match.group(0)
+        return '' if match.group(0).startswith('/*') else ' '
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', CSS_TOKENS.sub(token, text))
+    following = None  # the first of { } ; after the current part, strings skipped
+    for i in reversed(range(0, len(parts), 2)):
+        parts[i] = CSS_PUNCTUATION.sub(r'\1', parts[i]).replace(';}', '}')
+        parts[i], following = css_colons(parts[i], following)
+    return ''.join(parts).strip()
+
+
+def css_colons(text, following):
+    # A colon followed by "{" before any ";" or "}" is in a selector, where ".a :hover"
+    # and ".a:hover" differ; only colons in declarations lose their spaces
+    def colon(match):
+        ahead = CSS_BLOCK.search(text, match.end())
+        return match.group(0) if (ahead.group(0) if ahead else following) == '{' else ':'
+    first = CSS_BLOCK.search(text)
+    return CSS_COLON.sub(colon, text), first.group(0) if first else following
+
+
+def minify_js(text):
+    try:
+        import rjsmin  # optional; a regex minifier is not safe to hand-roll for JS
+    except ImportError:
+        lines = (line.rstrip() for line in text.splitlines())
+        return '\n'.join(line for line in lines if line and not line.lstrip().startswith('//'))
+    return rjsmin.jsmin(text)
+
+
+def fingerprint(path, content):
+    root, ext = posixpath.splitext(path)
+    return '%s.%s%s' % (root, hashlib.md5(content).hexdigest()[:12], ext)
+
+
+def write_file(dist, path, content):
+    import gzip
+    target = os.path.join(dist, *path.split('/'))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as output:
+        output.write(content)
+    if path.endswith(COMPRESS):
+        # mtime=0 keeps the .gz byte-identical across builds
+        with open(target + '.gz', 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9, mtime=0) as output:
+                output.write(content)
+        try:
+            import brotli  # optional; without it only gzip siblings are written
+        except ImportError:
+            return
+        with open(target + '.br', 'wb') as output:
+            output.write(brotli.compress(content, quality=11))
+
+
+def rewrite_urls(css, source, manifest):
+    # Points url() references at the hashed copies, relative to dist/<bundle dir>
+    base = posixpath.dirname(source)
+
+    def replace(match):
+        reference = match.group(2)
+        if ':' in reference or reference.startswith(('/', '#')):
+            return match.group(0)
+        path, _, suffix = reference.partition('?')
+        path, mark, fragment = path.partition('#')
+        target = posixpath.normpath(posixpath.join(base, path))
+        if target not in manifest:
+            return match.group(0)
+        url = posixpath.relpath(manifest[target], base)
+        return 'url("%s%s%s%s")' % (url, '?' + suffix if suffix else '', mark, fragment)
+    return CSS_URL.sub(replace, css)
+
+
+def build_assets(static_folder, echo=print):
+    import shutil
+    dist = os.path.join(static_folder, DIST)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+    paths = []
+    for directory, directories, files in os.walk(static_folder):
+        if directory == static_folder and DIST in directories:
+            directories.remove(DIST)
+        paths += [os.path.relpath(os.path.join(directory, name), static_folder).replace(os.sep, '/')
+                  for name in files if not name.startswith('.')]
+    manifest = {}
+    # Everything but CSS first, so stylesheets can refer to the hashed names
+    for path in sorted(paths, key=lambda p: (p.endswith('.css'), p)):
+        with open(os.path.join(static_folder, *path.split('/')), 'rb') as input:
+            content = input.read()
+        if path.endswith('.css'):
+            content = rewrite_urls(content.decode('utf-8'), path, manifest).encode('utf-8')
+        manifest[path] = fingerprint(path, content)
+        write_file(dist, manifest[path], content)
+    for bundle, sources in sorted(BUNDLES.items()):
+        chunks = []
+        for path in sources:
+            with open(os.path.join(static_folder, *path.split('/')), encoding='utf-8') as input:
+                text = input.read()
+            if bundle.endswith('.css'):
+                chunks.append(minify_css(rewrite_urls(text, path, manifest)))
+            else:
+                chunks.append(text if path.endswith('.min.js') else minify_js(text))
+        # ';' guards against a library that leaves its last statement unterminated
+        content = ('\n' if bundle.endswith('.css') else ';\n').join(chunks).encode('utf-8')
+        manifest[bundle] = fingerprint(bundle, content)
+        write_file(dist, manifest[bundle], content)
+        echo('%s: %d files, %d bytes' % (manifest[bundle], len(sources), len(content)))
+    with open(os.path.join(dist, MANIFEST), 'w') as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, DIST, MANIFEST)) as input:
+            return json.load(input)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def init_assets(app):
+    state = {'manifest': None if app.config.get('ASSETS_DEBUG') else load_manifest(app.static_folder)}
+    dist = os.path.join(app.static_folder, DIST)
+
+    def asset_url(filename):
+        # Same argument as url_for('static', filename=...)
+        manifest = state['manifest']
+        if manifest and filename in manifest:
+            return url_for('asset', filename=manifest[filename])
+        return url_for('static', filename=filename)
+
+    def asset_urls(bundle):
+        # One hashed URL once built; the separate source files otherwise
+        manifest = state['manifest']
+        if manifest and bundle in manifest:
+            return [url_for('asset', filename=manifest[bundle])]
+        return [url_for('static', filename=path) for path in BUNDLES[bundle]]
+
+    @app.route('/assets/<path:filename>', endpoint='asset')
+    def asset(filename):
+        if state['manifest'] is None:
+            abort(404)
+        mimetype = FONT_TYPES.get(posixpath.splitext(filename)[1]) or \
+            mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        encoding, name = None, filename
+        accepted = request.accept_encodings
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accepted[candidate] and os.path.isfile(os.path.join(dist, filename + suffix)):
+                encoding, name = candidate, filename + suffix
+                break
+        response = send_from_directory(dist, name, mimetype=mimetype,
+                                       cache_timeout=365 * 24 * 3600)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if filename.endswith(COMPRESS):
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    app.jinja_env.globals.update(asset_url=asset_url, asset_urls=asset_urls)
+    app.extensions['assets'] = state
+    return state
@@ -0,0 +1,63 @@
+# Compares the datetime Jinja filter against the original parse-every-call version.
+#
+#   python benchmarks/bench_datetime_filter.py [rows] [distinct]
+#
+# rows is the number of filter calls per run (one per show on the page),
+# distinct is how many different timestamps those rows cycle through.
+
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from filters import format_datetime, _format_datetime  # noqa: E402
+
+
+def original_format_datetime(value, format='medium'):
+    # The filter as it was before memoization, kept here as the baseline
+    date = dateutil.parser.parse(value)
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    start = datetime(2026, 1, 1, 20, 0)
+    times = [start + timedelta(hours=i % distinct) for i in range(rows)]
+    strings = [str(t) for t in times]
+
+    assert format_datetime(times[0], 'full') == original_format_datetime(
+        strings[0], 'full')
+
+    def cold(values):
+        def run():
+            _format_datetime.cache_clear()
+            for v in values:
+                format_datetime(v, 'full')
+        return run
+
+    cases = [
+        ('original, str values', lambda: [
+         original_format_datetime(v, 'full') for v in strings]),
+        ('new, str values, cold cache', cold(strings)),
+        ('new, datetime values, cold cache', cold(times)),
+        ('new, datetime values, warm cache', lambda: [
+         format_datetime(v, 'full') for v in times]),
+    ]
+    print('%d rows, %d distinct timestamps' % (rows, distinct))
+    for name, run in cases:
+        best = min(timeit.repeat(run, number=1, repeat=5))
+        print('%-36s %8.2f ms  %6.2f us/row' %
+              (name, best * 1000, best * 1e6 / rows))
+
+
+if __name__ == '__main__':
+    main()
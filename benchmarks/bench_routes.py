@@ -0,0 +1,308 @@
+# Seeds a synthetic catalog and drives every route through the Flask test client.
+#
+#   python benchmarks/bench_routes.py --seed [--full] [--requests 50] [--output results.json]
+#
+# --seed loads venues, artists and shows into the configured database (only
+# if its tables are empty); --full uses 50k venues, 200k artists and 2M shows.
+# For every route the run reports p50/p95/p99 latency, statements per
+# request (read from the Server-Timing header) and process RSS, and writes
+# the whole result as JSON so runs can be diffed. Cold start (import plus
+# first request per page in a fresh process) is measured with an empty
+# template bytecode cache and again with a filled cache and warm-up.
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app, db, Venue, Artist, Show  # noqa: E402
+from forms import VenueForm  # noqa: E402
+from importer import import_records  # noqa: E402
+from queries import booking_index  # noqa: E402
+
+GENRES = [value for value, _ in VenueForm.genres.kwargs['choices']]
+CITIES = [('San Francisco', 'CA'), ('Oakland', 'CA'), ('Los Angeles', 'CA'),
+          ('New York', 'NY'), ('Brooklyn', 'NY'), ('Austin', 'TX'),
+          ('Houston', 'TX'), ('Seattle', 'WA'), ('Portland', 'OR'),
+          ('Chicago', 'IL'), ('Nashville', 'TN'), ('Atlanta', 'GA'),
+          ('Boston', 'MA'), ('Denver', 'CO'), ('Miami', 'FL'), ('Detroit', 'MI')]
+WORDS = ['Musical', 'Hop', 'Park', 'Square', 'Live', 'Music', 'Coffee', 'Dueling',
+         'Pianos', 'Bar', 'Wild', 'Sax', 'Band', 'Guns', 'Petals', 'Hall', 'Club',
+         'Lounge', 'Theatre', 'Garden', 'Electric', 'Blue', 'Velvet', 'Echo']
+
+SIZES = {'default': (500, 2000, 20000), 'full': (50000, 200000, 2000000)}
+# Share of seed records that may be rejected (double bookings) before the run gives up
+MAX_SEED_LOSS = 0.05
+
+
+def name(rng, i):
+    return '%s %s %d' % (rng.choice(WORDS), rng.choice(WORDS), i)
+
+
+def venue_records(rng, count):
+    for i in range(count):
+        city, state = rng.choice(CITIES)
+        yield {'name': 'The ' + name(rng, i), 'city': city, 'state': state,
+               'address': '%d Main St' % rng.randint(1, 9999), 'phone': '555-555-%04d' % (i % 10000),
+               'genres': rng.sample(GENRES, rng.randint(1, 3)),
+               'image_link': 'https://example.com/v/%d.jpg' % i,
+               'facebook_link': 'https://www.facebook.com/v%d' % i,
+               'seeking_talent': rng.random() < 0.5, 'seeking_description': ''}
+
+
+def artist_records(rng, count):
+    for i in range(count):
+        city, state = rng.choice(CITIES)
+        yield {'name': name(rng, i), 'city': city, 'state': state,
+               'phone': '555-444-%04d' % (i % 10000), 'genres': rng.sample(GENRES, rng.randint(1, 3)),
+               'image_link': 'https://example.com/a/%d.jpg' % i,
+               'facebook_link': 'https://www.facebook.com/a%d' % i,
+               'seeking_venue': rng.random() < 0.5, 'seeking_description': ''}
+
+
+def show_records(rng, count, venueIds, artistIds):
+    # Two years of history and one year of upcoming shows around now
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    for i in range(count):
+        yield {'venue_id': rng.randint(*venueIds), 'artist_id': rng.randint(*artistIds),
+               'start_time': now + timedelta(hours=rng.randint(-2 * 8760, 8760))}
+
+
+def id_range(model):
+    return db.session.query(db.func.min(model.id), db.func.max(model.id)).one()
+
+
+def seeded(table, requested, count, failures, started):
+    print('seeded %d %s in %.1fs (%d failures)' % (
+        count, table, time.perf_counter() - started, len(failures)))
+    if requested - count > requested * MAX_SEED_LOSS:
+        for failure in failures[:5]:
+            print(failure)
+        sys.exit('Only %d of %d %s loaded; refusing to benchmark a partial catalog.' % (
+            count, requested, table))
+
+
+def seed(rng, venues, artists, shows, batch_size):
+    if db.session.query(Venue.id).first() or db.session.query(Artist.id).first():
+        sys.exit('Refusing to seed: the configured database already has data.')
+    quiet = lambda message: None
+    for model, records, requested in ((Venue, venue_records(rng, venues), venues),
+                                      (Artist, artist_records(rng, artists), artists)):
+        started = time.perf_counter()
+        count, failures = import_records(db.engine, model.__table__, records, batch_size, quiet)
+        seeded(model.__tablename__, requested, count, failures, started)
+    # Random slots overlap now and then; drop those records before they reach the
+    # exclusion constraints, which would roll back their whole batch
+    bookings = booking_index()
+    check = lambda row: '; '.join(bookings.book(
+        row['venue_id'], row['artist_id'], row['start_time'], row['duration'])) or None
+    started = time.perf_counter()
+    count, failures = import_records(db.engine, Show.__table__, show_records(
+        rng, shows, id_range(Venue), id_range(Artist)), batch_size, quiet, check=check)
+    seeded('shows', shows, count, failures, started)
+
+
+def rss_mb():
+    # Current resident set size; falls back to the peak where /proc is missing
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2.0 ** 20
+    except (IOError, OSError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2.0 ** 20 if sys.platform == 'darwin' else peak / 1024.0
+
+
+def statements(response):
+    for value in response.headers.getlist('Server-Timing'):
+        if value.startswith('db;'):
+            return int(value.split('desc="')[1].split()[0])
+    return None
+
+
+def percentile(sortedValues, fraction):
+    if not sortedValues:
+        return None
+    return sortedValues[min(len(sortedValues) - 1, int(round(fraction * (len(sortedValues) - 1))))]
+
+
+def form(rng, i):
+    city, state = rng.choice(CITIES)
+    return {'name': 'Bench %d' % i, 'city': city, 'state': state, 'address': '1 Bench St',
+            'phone': '555-000-0000', 'genres': rng.sample(GENRES, 2),
+            'image_link': 'https://example.com/b.jpg', 'facebook_link': 'https://www.facebook.com/b'}
+
+
+def newest_venue():
+    # Cases run outside the seeding app context, one request context at a time
+    with app.app_context():
+        return db.session.query(db.func.max(Venue.id)).scalar()
+
+
+def route_cases(rng):
+    # (label, method, url or callable returning a url, form data or callable)
+    venueIds, artistIds = id_range(Venue), id_range(Artist)
+    venue = lambda: rng.randint(*venueIds)
+    artist = lambda: rng.randint(*artistIds)
+    term = lambda i: {'search_term': rng.choice(WORDS)[:rng.randint(3, 5)]}
+    future = lambda i: {'venue_id': venue(), 'artist_id': artist(),
+                        'start_time': str(datetime.now() + timedelta(days=rng.randint(1, 365)))}
+    return [
+        ('index', 'GET', '/', None),
+        ('venues', 'GET', '/venues', None),
+        ('search_venues', 'POST', '/venues/search', term),
+        ('show_venue', 'GET', lambda: '/venues/%d' % venue(), None),
+        ('create_venue_form', 'GET', '/venues/create', None),
+        ('create_venue_submission', 'POST', '/venues/create', lambda i: form(rng, i)),
+        ('artists', 'GET', '/artists', None),
+        ('search_artists', 'POST', '/artists/search', term),
+        ('show_artist', 'GET', lambda: '/artists/%d' % artist(), None),
+        ('edit_artist', 'GET', lambda: '/artists/%d/edit' % artist(), None),
+        ('edit_artist_submission', 'POST', lambda: '/artists/%d/edit' % artist(), lambda i: form(rng, i)),
+        ('edit_venue', 'GET', lambda: '/venues/%d/edit' % venue(), None),
+        ('edit_venue_submission', 'POST', lambda: '/venues/%d/edit' % venue(), lambda i: form(rng, i)),
+        ('create_artist_form', 'GET', '/artists/create', None),
+        ('create_artist_submission', 'POST', '/artists/create', lambda i: form(rng, i)),
+        ('shows', 'GET', '/shows', None),
+        ('create_shows', 'GET', '/shows/create', None),
+        ('create_show_submission', 'POST', '/shows/create', future),
+        ('export_shows', 'GET', '/export/shows.ndjson', None),
+        ('export_venues', 'GET', '/export/venues.csv', None),
+        ('export_artists', 'GET', '/export/artists.ndjson', None),
+        ('cache_stats', 'GET', '/cache/stats', None),
+        ('pool_stats', 'GET', '/pool/stats', None),
+        ('search_venues_genre', 'GET', lambda: '/venues/search?search_term=%s&genre=%s' % (
+            rng.choice(WORDS)[:3], rng.choice(GENRES)), None),
+        ('api_venues', 'GET', lambda: '/api/v1/venues?genre=%s' % rng.choice(GENRES), None),
+        ('api_venue', 'GET', lambda: '/api/v1/venues/%d?include=upcoming_shows,past_shows' % venue(), None),
+        ('api_artists', 'GET', '/api/v1/artists', None),
+        ('api_artist', 'GET', lambda: '/api/v1/artists/%d?include=upcoming_shows,past_shows' % artist(), None),
+        ('api_shows', 'GET', '/api/v1/shows?include=venue,artist', None),
+        ('api_genres', 'GET', '/api/v1/genres', None),
+        ('api_city_calendar', 'GET', lambda: '/api/v1/calendar?city=%s&state=%s' % rng.choice(CITIES), None),
+        ('api_venue_calendar', 'GET', lambda: '/api/v1/venues/%d/calendar' % venue(), None),
+        # Deletes the venues the create_venue_submission case added
+        ('delete_venue', 'DELETE', lambda: '/venues/%d' % newest_venue(), None),
+    ]
+
+
+def run_case(client, case, requests):
+    label, method, url, data = case
+    latencies, counts, statuses = [], [], {}
+    for i in range(requests):
+        target = url() if callable(url) else url
+        payload = data(i) if callable(data) else data
+        started = time.perf_counter()
+        response = client.open(target, method=method, data=payload)
+        response.get_data()  # drains streamed responses
+        latencies.append((time.perf_counter() - started) * 1000)
+        counts.append(statements(response))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    latencies.sort()
+    counts = [c for c in counts if c is not None]
+    return {
+        'route': label, 'method': method, 'requests': requests,
+        'status_codes': dict((str(k), v) for k, v in statuses.items()),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'queries_per_request': round(float(sum(counts)) / len(counts), 2) if counts else None,
+        'max_queries': max(counts) if counts else None,
+        'rss_mb': round(rss_mb(), 1)
+    }
+
+
+def cold_start():
+    # Two fresh processes: nothing compiled yet, then compiled bytecode plus warm-up
+    probe = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cold_start.py')
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, JINJA_CACHE_DIR=directory, WARM_UP_ON_START='false')
+        for label, extra in (('cold', []), ('warm', ['--warm-up'])):
+            output = subprocess.check_output([sys.executable, probe] + extra, env=env)
+            results[label] = json.loads(output.decode().strip().splitlines()[-1])
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a synthetic catalog and benchmark every route.')
+    parser.add_argument('--seed', action='store_true', help='load a synthetic dataset first')
+    parser.add_argument('--full', action='store_true', help='seed 50k venues, 200k artists, 2M shows')
+    parser.add_argument('--venues', type=int)
+    parser.add_argument('--artists', type=int)
+    parser.add_argument('--shows', type=int)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=50, help='requests per route')
+    parser.add_argument('--routes', help='comma separated route labels to run')
+    parser.add_argument('--random-seed', type=int, default=1)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--no-cold-start', dest='cold_start', action='store_false',
+                        help='skip the fresh-process startup measurement')
+    args = parser.parse_args()
+
+    rng = random.Random(args.random_seed)
+    venues, artists, shows = SIZES['full' if args.full else 'default']
+    with app.app_context():
+        if args.seed:
+            seed(rng, args.venues or venues, args.artists or artists,
+                 args.shows or shows, args.batch_size)
+        cases = route_cases(rng)
+        if args.routes:
+            wanted = set(args.routes.split(','))
+            cases = [c for c in cases if c[0] in wanted]
+        dataset = dict((model.__tablename__, db.session.query(db.func.count(model.id)).scalar())
+                       for model in (Venue, Artist, Show))
+        database = db.engine.dialect.name
+        db.session.remove()
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['PROPAGATE_EXCEPTIONS'] = False  # errors are counted as 500s, not raised
+    client = app.test_client()
+    results = []
+    for case in cases:
+        result = run_case(client, case, args.requests)
+        results.append(result)
+        print('%-26s p50 %8.2f  p95 %8.2f  p99 %8.2f ms  %6s q/req  %7.1f MB' % (
+            result['route'], result['p50_ms'], result['p95_ms'], result['p99_ms'],
+            result['queries_per_request'], result['rss_mb']))
+
+    startup = cold_start() if args.cold_start else None
+    if startup:
+        for label, result in sorted(startup.items()):
+            print('cold start (%s)%s import %8.1f  first requests %8.1f ms  ready %8.1f ms' % (
+                label, ' ' * (14 - len(label)), result['import_ms'],
+                sum(result['first_request_ms'].values()), result['ready_ms']))
+
+    report = {
+        'started_at': datetime.utcnow().isoformat() + 'Z',
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'database': database,
+        'dataset': dataset,
+        'requests_per_route': args.requests,
+        'cold_start': startup,
+        'routes': results
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+    print('wrote %s' % args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Times `import app` (which runs create_app()) in fresh interpreters with
+# `python -X importtime` and fails when startup goes over budget.
+#
+#   python benchmarks/bench_startup.py [--runs 5] [--budget-ms 450] [--top 15]
+#
+# Prints the median total and the slowest modules by cumulative import time.
+# Exits 1 if the median is over --budget-ms, or if any module in DEFERRED was
+# imported at startup: those are only needed by some requests or commands
+# and must stay behind a function-level import.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 450
+DEFERRED = ['flask_migrate', 'alembic', 'flask_wtf', 'wtforms', 'babel', 'dateutil.parser',
+            'importer', 'exporter', 'booking', 'forms']
+
+
+def import_times():
+    # ({module: cumulative microseconds}, modules app imports directly) for one fresh interpreter
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                             cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    if process.returncode:
+        sys.exit(process.stderr)
+    # Children are listed before their parent, one indent level deeper
+    times, children, direct = {}, [], []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        times[name] = int(cumulative)
+        if depth == 1:
+            children.append(name)
+        elif depth == 0:
+            direct, children = (children if name == 'app' else direct), []
+    return times, direct
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure app import time against a budget.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15, help='slowest modules to list')
+    parser.add_argument('--output', help='write the result as JSON')
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    totalMs = median([times['app'] for times, _ in runs]) / 1000.0
+    # What each of app's own imports costs, including everything it is first to pull in
+    slowest = sorted(((median([times.get(name, 0) for times, _ in runs]) / 1000.0, name)
+                      for name in runs[0][1]), reverse=True)
+    for ms, name in slowest[:args.top]:
+        print('%8.1f ms  %s' % (ms, name))
+    eager = [name for name in DEFERRED if any(name in times for times, _ in runs)]
+    print('import app: %.1f ms (median of %d, budget %.0f ms)' % (totalMs, args.runs, args.budget_ms))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'import_ms': totalMs, 'budget_ms': args.budget_ms, 'runs': args.runs,
+                       'eager_deferred_modules': eager,
+                       'slowest': [{'module': name, 'ms': ms} for ms, name in slowest[:args.top]]},
+                      output, indent=2, sort_keys=True)
+    failed = False
+    if eager:
+        print('imported at startup but should be deferred: %s' % ', '.join(eager))
+        failed = True
+    if totalMs > args.budget_ms:
+        print('over budget by %.1f ms' % (totalMs - args.budget_ms))
+        failed = True
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Measures how long a fresh process takes to import the app and answer its
+# first request on each page, as a new worker would after a deploy.
+#
+#   python benchmarks/cold_start.py [--warm-up] [--routes /,/venues]
+#
+# --warm-up runs the same warm-up as WARM_UP_ON_START before the first
+# request. Point JINJA_CACHE_DIR at an empty directory to measure a worker
+# without compiled templates on disk. Prints one JSON object.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+started = time.perf_counter()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app, db, Venue, Artist  # noqa: E402
+from filters import format_datetime  # noqa: E402
+from warmup import warm_up  # noqa: E402
+
+ROUTES = ['/', '/venues', '/artists', '/shows', '/venues/{venue}', '/artists/{artist}']
+
+
+def main():
+    imported = time.perf_counter()
+    parser = argparse.ArgumentParser(description='Time a cold worker.')
+    parser.add_argument('--warm-up', action='store_true')
+    parser.add_argument('--routes', help='comma separated paths; {venue} and {artist} become ids')
+    args = parser.parse_args()
+
+    report = {'import_ms': round((imported - started) * 1000, 3)}
+    if args.warm_up:
+        report['warm_up'] = warm_up(app, db, [format_datetime])
+    with app.app_context():
+        ids = {'venue': db.session.query(db.func.min(Venue.id)).scalar() or 1,
+               'artist': db.session.query(db.func.min(Artist.id)).scalar() or 1}
+        db.session.remove()
+    client = app.test_client()
+    firsts = {}
+    for route in args.routes.split(',') if args.routes else ROUTES:
+        path = route.format(**ids)
+        requestStarted = time.perf_counter()
+        client.get(path).get_data()
+        firsts[route] = round((time.perf_counter() - requestStarted) * 1000, 3)
+    report['first_request_ms'] = firsts
+    report['ready_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    print(json.dumps(report, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+from bisect import bisect_right
+from datetime import timedelta
+
+#----------------------------------------------------------------------------#
+# Double-booking detection.
+#
+# Keeps each venue's and artist's shows as sorted, non-overlapping
+# [start, end) intervals. Finding a conflict is a binary search plus a look
+# at the neighbours on either side, so checking a show is O(log n) however
+# long the schedule is. Postgres enforces the same rule with GiST exclusion
+# constraints; this is the check used before inserting and for bulk loads.
+#----------------------------------------------------------------------------#
+
+
+class IntervalIndex(object):
+
+    def __init__(self):
+        self.starts = {}  # key -> sorted start times
+        self.ends = {}  # key -> end times, parallel to starts
+
+    def conflict(self, key, start, end):
+        # Returns the (start, end) of an overlapping interval, or None
+        starts = self.starts.get(key)
+        if not starts:
+            return None
+        i = bisect_right(starts, start)
+        if i > 0 and self.ends[key][i - 1] > start:
+            return starts[i - 1], self.ends[key][i - 1]
+        if i < len(starts) and starts[i] < end:
+            return starts[i], self.ends[key][i]
+        return None
+
+    def add(self, key, start, end):
+        starts = self.starts.setdefault(key, [])
+        i = bisect_right(starts, start)
+        starts.insert(i, start)
+        self.ends.setdefault(key, []).insert(i, end)
+
+
+class BookingIndex(object):
+
+    def __init__(self):
+        self.venues = IntervalIndex()
+        self.artists = IntervalIndex()
+
+    def conflicts(self, venue_id, artist_id, start, duration):
+        # Returns a list of human readable conflicts, empty when the show fits
+        end = start + timedelta(minutes=duration)
+        problems = []
+        clash = self.venues.conflict(venue_id, start, end)
+        if clash:
+            problems.append('venue %s is booked %s to %s' % (venue_id, clash[0], clash[1]))
+        clash = self.artists.conflict(artist_id, start, end)
+        if clash:
+            problems.append('artist %s is playing %s to %s' % (artist_id, clash[0], clash[1]))
+        return problems
+
+    def add(self, venue_id, artist_id, start, duration):
+        end = start + timedelta(minutes=duration)
+        self.venues.add(venue_id, start, end)
+        self.artists.add(artist_id, start, end)
+
+    def book(self, venue_id, artist_id, start, duration):
+        # Adds the show if it fits; returns the conflicts otherwise
+        problems = self.conflicts(venue_id, artist_id, start, duration)
+        if not problems:
+            self.add(venue_id, artist_id, start, duration)
+        return problems
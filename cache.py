@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+#----------------------------------------------------------------------------#
+# Page data cache.
+#
+# Backends expose get(key), set(key, value, ttl) and delete(*keys). The local
+# backend is an in-process LRU with per-entry expiry; the shared backend
+# wraps anything that speaks the Redis get/set/delete commands, so a real
+# Redis or a local stand-in can be dropped in through config.
+#----------------------------------------------------------------------------#
+
+
+class LocalCache(object):
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+class SharedCache(object):
+
+    def __init__(self, client, prefix='fyyur:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+
+class PageCache(object):
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build, version=None):
+        # version names the state the caller expects; an entry built for another one is
+        # rebuilt, since only the worker that wrote invalidates its local entries
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = build()
+        self.backend.set(key, [version, value], self.ttl)
+        return value
+
+    def invalidate(self, *keys):
+        self.backend.delete(*keys)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': float(self.hits) / lookups if lookups else 0.0
+        }
+
+
+def make_cache(config):
+    ttl = config.get('CACHE_TTL', 60)
+    url = config.get('CACHE_REDIS_URL')
+    if url:
+        import redis  # only needed when a shared cache is configured
+        return PageCache(SharedCache(redis.Redis.from_url(url)), ttl)
+    return PageCache(LocalCache(config.get('CACHE_MAX_ENTRIES', 1024)), ttl)
@@ -0,0 +1,116 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from extensions import db
+from filters import format_datetime
+from models import Artist, Show, Venue
+from queries import booking_index, reconcile_counters, roll_show_counters
+from warmup import warm_up
+
+#----------------------------------------------------------------------------#
+# Commands.
+#----------------------------------------------------------------------------#
+
+IMPORT_MODELS = {'venues': Venue, 'artists': Artist, 'shows': Show}
+
+
+@ click.command('import')
+@ with_appcontext
+@ click.argument('kind', type=click.Choice(sorted(IMPORT_MODELS)))
+@ click.argument('path', type=click.File('r', encoding='utf-8'))
+@ click.option('--format', 'format', type=click.Choice(['csv', 'jsonl']),
+               help='Input format; guessed from the file extension if omitted.')
+@ click.option('--batch-size', default=1000, show_default=True,
+               help='Records per transaction.')
+@ click.option('--no-conflict-check', 'conflict_check', flag_value=False, default=True,
+               help='Skip the double-booking check when importing shows.')
+def import_command(kind, path, format, batch_size, conflict_check):
+    """Bulk load venues, artists or shows from a CSV or JSON Lines file.
+
+    CSV genres are separated with ";". Use "-" as PATH to read stdin.
+    """
+    from importer import import_records, read_records
+    if format is None:
+        format = 'csv' if path.name.endswith('.csv') else 'jsonl'
+    check = None
+    if kind == 'shows':
+        maxDuration = current_app.config['SHOW_MAX_DURATION']
+        bookings = booking_index() if conflict_check else None
+
+        def check_show(row):
+            # Same duration limit as the form; with the conflict check on, also books each
+            # record into the in-memory schedule so conflicts become failures
+            duration = row.get('duration')
+            if duration is not None and not 0 < duration <= maxDuration:
+                return 'duration must be between 1 and %d minutes' % maxDuration
+            if bookings is None or row.get('start_time') is None:
+                return None
+            return '; '.join(bookings.book(row.get('venue_id'), row.get('artist_id'),
+                                           row['start_time'], duration)) or None
+        check = check_show
+    imported, failures = import_records(
+        db.engine, IMPORT_MODELS[kind].__table__, read_records(path, format),
+        batch_size=batch_size, echo=click.echo, check=check)
+    for failure in failures:
+        click.echo(failure, err=True)
+    click.echo('Imported %d %s, %d failures.' % (imported, kind, len(failures)))
+    if kind == 'shows' and imported:
+        # Bulk inserts skip the per-show counter updates
+        click.echo('Recounted %d venues/artists.' % reconcile_counters(
+            fix=True, echo=lambda message: None))
+    if failures:
+        raise SystemExit(1)
+
+
+@ click.command('roll-show-counters')
+@ with_appcontext
+def roll_show_counters_command():
+    """Move shows that have started from the upcoming to the past counters.
+
+    Run it periodically (e.g. every few minutes from cron); listing counts are
+    at most one interval out of date.
+    """
+    click.echo('Rolled %d shows into the past counters.' % roll_show_counters())
+
+
+@ click.command('reconcile-counters')
+@ with_appcontext
+@ click.option('--fix', is_flag=True, help='Overwrite counters that are wrong.')
+def reconcile_counters_command(fix):
+    """Check the venue and artist show counters against the shows table."""
+    mismatches = reconcile_counters(fix=fix, echo=click.echo)
+    click.echo('%d mismatched venues/artists%s.' % (mismatches, ', fixed' if fix and mismatches else ''))
+    if mismatches and not fix:
+        raise SystemExit(1)
+
+
+@ click.command('warm-up')
+@ with_appcontext
+def warm_up_command():
+    """Compile every template into the bytecode cache and prime the caches.
+
+    Run it once on deploy so new workers start from compiled templates.
+    """
+    for name, ms in sorted(warm_up(current_app._get_current_object(), db, [format_datetime]).items()):
+        click.echo('%s: %.1f ms' % (name, ms))
+
+
+@ click.command('assets')
+@ with_appcontext
+def assets_command():
+    """Bundle, minify, fingerprint and precompress everything under static/.
+
+    Run it on deploy; templates keep serving the plain /static files until
+    static/dist/manifest.json exists.
+    """
+    from assets import build_assets
+    state = current_app.extensions['assets']
+    state['manifest'] = build_assets(current_app.static_folder, echo=click.echo)
+    click.echo('Wrote %d assets.' % len(state['manifest']))
+
+
+def init_commands(app):
+    for command in (import_command, roll_show_counters_command, reconcile_counters_command,
+                    warm_up_command, assets_command):
+        app.cli.add_command(command)
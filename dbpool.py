@@ -0,0 +1,59 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+#----------------------------------------------------------------------------#
+# Connection pool instrumentation.
+#----------------------------------------------------------------------------#
+
+
+class InstrumentedQueuePool(QueuePool):
+    # QueuePool that records how long callers wait for a connection
+
+    def __init__(self, *args, **kwargs):
+        super(InstrumentedQueuePool, self).__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.peak_overflow = 0
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super(InstrumentedQueuePool, self)._do_get()
+        except TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.monotonic() - started
+            with self._stats_lock:
+                self.waits += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+                self.peak_overflow = max(self.peak_overflow, self.overflow())
+
+
+def pool_stats(pool):
+    stats = {'pool_class': type(pool).__name__, 'status': pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                'peak_overflow': pool.peak_overflow,
+                'checkouts': pool.waits,
+                'timeouts': pool.timeouts,
+                'wait_avg_ms': 1000 * pool.wait_total / pool.waits if pool.waits else 0.0,
+                'wait_max_ms': 1000 * pool.wait_max,
+            })
+    return stats
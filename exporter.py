@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+#----------------------------------------------------------------------------#
+# Streaming export.
+#
+# Generators that turn query rows into CSV or NDJSON text a chunk at a time,
+# so a response can be streamed without holding the table in memory.
+#----------------------------------------------------------------------------#
+
+CHUNK_ROWS = 500
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_chunks(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for number, row in enumerate(rows, 1):
+        writer.writerow([';'.join(v) if isinstance(v, list) else _value(v)
+                         for v in row])
+        if number % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(columns, rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, map(_value, row)))))
+        if len(lines) == CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes a gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
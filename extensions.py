@@ -0,0 +1,32 @@
+from flask import current_app
+from flask_moment import Moment
+from werkzeug.local import LocalProxy
+
+from routing import RoutingSQLAlchemy
+
+#----------------------------------------------------------------------------#
+# Extensions.
+#
+# Created unbound and attached to an app by create_app(), so models, queries
+# and views can import them before any app exists. The per-app services
+# (page cache, name search, genre facets, query fan-out, show schedule) live in app.extensions and are
+# reached through the proxies below.
+#----------------------------------------------------------------------------#
+
+db = RoutingSQLAlchemy()  # GET views read from replicas when configured
+moment = Moment()
+
+# Assembled venue and artist page data, keyed 'venue:<id>' / 'artist:<id>'
+pageCache = LocalProxy(lambda: current_app.extensions['page_cache'])
+venueSearch = LocalProxy(lambda: current_app.extensions['search']['venues'])
+artistSearch = LocalProxy(lambda: current_app.extensions['search']['artists'])
+venueGenres = LocalProxy(lambda: current_app.extensions['genres']['venues'])
+artistGenres = LocalProxy(lambda: current_app.extensions['genres']['artists'])
+fanout = LocalProxy(lambda: current_app.extensions['fanout'])  # concurrent detail page queries
+schedule = LocalProxy(lambda: current_app.extensions['schedule'])  # calendar index
+
+
+def init_migrate(app):
+    # Alembic is by far the slowest import in the app and only `flask db` needs it
+    from flask_migrate import Migrate
+    Migrate(app, db)
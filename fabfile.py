@@ -6,13 +6,23 @@ from fabric.contrib.console import confirm
 
 def test():
     with settings(warn_only=True):
-        result = local(
-            "python test_tasks.py -v && python test_users.py -v", capture=True
-        )
+        result = local("python -m pytest tests", capture=True)
     if result.failed and not confirm("Tests failed. Continue?"):
         abort("Aborted at user request.")
 
 
+def bench():
+    local("python benchmarks/bench_routes.py --output bench_results.json")
+
+
+def startup():
+    local("python benchmarks/bench_startup.py")
+
+
+def assets():
+    local("FLASK_APP=app.py flask assets")
+
+
 def commit():
     message = raw_input("Enter a git commit message: ")
     local("git add . && git commit -am '{}'".format(message))
@@ -39,9 +49,7 @@ def heroku():
 
 
 def heroku_test():
-    local(
-        "heroku run python test_tasks.py -v && heroku run python test_users.py -v"
-    )
+    local("heroku run python -m pytest tests")
 
 
 def deploy():
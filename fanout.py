@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g
+
+#----------------------------------------------------------------------------#
+# Concurrent page queries.
+#
+# gather() runs independent read callables on a small thread pool and returns
+# their results in order. Each callable runs in a fresh app context of its
+# own, and so with its own scoped session and connection; it gets no request
+# context, so it must not touch request or session. The request's replica
+# choice is handed to each worker through g, and the statements the workers
+# run are added to the request's Server-Timing totals once they finish. With
+# no workers configured the callables simply run one after another on the
+# caller's session.
+#
+# The caller's session is released before the callables are submitted, so a
+# request never holds a pooled connection while it waits for workers that
+# need one from the same pool. gather() is therefore only for read-only views.
+#----------------------------------------------------------------------------#
+
+SHARED_G = ('replica_engine',)  # what a worker needs from the request's g
+COUNTERS = ('sql_statements', 'sql_seconds')  # what it hands back
+
+
+class Fanout(object):
+
+    def __init__(self, db, workers):
+        self.db = db
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='fanout') if workers else None
+
+    def _run(self, app, shared, call):
+        # Tearing the context down also removes this thread's session
+        with app.app_context():
+            for name, value in shared.items():
+                setattr(g, name, value)
+            result = call()
+            return result, dict((name, g.get(name, 0)) for name in COUNTERS)
+
+    def gather(self, *calls):
+        if self.executor is None or len(calls) < 2:
+            return [call() for call in calls]
+        app = current_app._get_current_object()
+        shared = dict((name, g.get(name)) for name in SHARED_G if name in g)
+        self.db.session.remove()  # e.g. the connection the conditional() validator used
+        futures = [self.executor.submit(self._run, app, shared, call) for call in calls]
+        results = []
+        # result() re-raises, so an abort(404) in any callable reaches the view
+        for future in futures:
+            result, counters = future.result()
+            for name, value in counters.items():
+                setattr(g, name, g.get(name, 0) + value)
+            results.append(result)
+        return results
+
+
+def init_fanout(app, db):
+    # Every worker can hold a connection at once; leave one for request threads
+    workers = app.config.get('PAGE_FANOUT_WORKERS', 0)
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if 'pool_size' in options:
+        workers = min(workers, options['pool_size'] + options.get('max_overflow', 0) - 1)
+    return Fanout(db, max(workers, 0))
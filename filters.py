@@ -0,0 +1,43 @@
+from datetime import datetime
+from functools import lru_cache
+
+#----------------------------------------------------------------------------#
+# Jinja filters.
+#
+# babel's locale data and dateutil are imported on the first formatted date,
+# not when a worker starts.
+#----------------------------------------------------------------------------#
+
+DATETIME_FORMATS = {
+    'full': "EEEE MMMM, d, y 'at' h:mma",
+    'medium': "EE MM, dd, y h:mma"
+}
+
+
+@lru_cache(maxsize=None)
+def compiled_format(format, locale):
+    # Parses the babel pattern and locale once per (format, locale) pair
+    import babel.dates
+    pattern = DATETIME_FORMATS.get(format, format)
+    return babel.dates.parse_pattern(pattern), babel.Locale.parse(locale)
+
+
+@lru_cache(maxsize=4096)
+def _format_datetime(value, format, locale):
+    if not isinstance(value, datetime):
+        import dateutil.parser
+        value = dateutil.parser.parse(value)
+    # Shown as stored, like babel.dates.format_datetime without a tzinfo: no conversion
+    pattern, locale = compiled_format(format, locale)
+    return pattern.apply(value, locale)
+
+
+@lru_cache(maxsize=None)
+def default_locale():
+    import babel.dates
+    return babel.dates.LC_TIME or 'en_US'
+
+
+def format_datetime(value, format='medium', locale=None):
+    # Accepts datetimes or strings; repeated timestamps come from the bounded cache
+    return _format_datetime(value, format, locale or default_locale())
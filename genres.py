@@ -0,0 +1,153 @@
+from sqlalchemy import cast, false, func, text
+from sqlalchemy.dialects.postgresql import array
+
+#----------------------------------------------------------------------------#
+# Genre filters and facets.
+#
+# Both backends share one interface: filter(query, genres) narrows a venue or
+# artist query to rows tagged with every given genre, and facets(genres, ids)
+# returns [(genre, count)] for the rows that match, in GENRES order. Postgres
+# uses the GIN indexes on the genres arrays through the @> operator; anything
+# else gets an in-process bitmap per genre kept up to date by mapper events
+# (see search.track_changes), so a catalog-wide facet count is one AND and
+# popcount per genre. Its filter() writes the matching ids into the statement
+# as an IN list of integer literals; a bound parameter each would run into
+# SQLite's limit on parameters per statement for any broad genre.
+#----------------------------------------------------------------------------#
+
+# The choices offered by the venue and artist forms
+GENRES = ['Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk', 'Funk',
+          'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz', 'Musical Theatre', 'Pop', 'Punk',
+          'R&B', 'Reggae', 'Rock n Roll', 'Soul', 'Other']
+
+
+def selected_genres(values):
+    # ?genre=Jazz&genre=Funk, without blanks or repeats, in the order given
+    genres = []
+    for value in values:
+        value = value.strip()
+        if value and value not in genres:
+            genres.append(value)
+    return genres
+
+
+def ordered_facets(counts, genres):
+    # Form genres first, then anything older data carries; the selected ones always show
+    known = [(g, counts.get(g, 0)) for g in GENRES]
+    extra = sorted((g, n) for g, n in counts.items() if g not in GENRES)
+    return [(g, n) for g, n in known + extra if n or g in genres]
+
+
+class PostgresGenres(object):
+
+    def __init__(self, session, model):
+        self.session = session
+        self.model = model
+
+    def filter(self, query, genres):
+        if not genres:
+            return query
+        # The models use the generic ARRAY type, which has no contains(); the cast keeps
+        # both sides varchar[] so the GIN index applies
+        return query.filter(self.model.genres.op('@>')(cast(array(genres), self.model.genres.type)))
+
+    def keep(self, ids, genres):
+        # The ids, in order, whose rows carry every genre
+        if not genres or not ids:
+            return list(ids)
+        found = set(id for id, in self.filter(
+            self.session.query(self.model.id).filter(self.model.id.in_(ids)), genres))
+        return [id for id in ids if id in found]
+
+    def facets(self, genres=(), ids=None):
+        rows = self.filter(self.session.query(func.unnest(self.model.genres).label('genre')), genres)
+        if ids is not None:
+            rows = rows.filter(self.model.id.in_(ids))
+        tags = rows.subquery()
+        counts = dict(self.session.query(tags.c.genre, func.count()).group_by(tags.c.genre))
+        return ordered_facets(counts, genres)
+
+    def remove(self, id):
+        pass  # the database is the index
+
+
+class LocalGenres(object):
+
+    def __init__(self, session, model):
+        self.session = session
+        self.model = model
+        self.bitmaps = None  # genre -> int with bit <id> set, built on first use
+        self.tagged = {}  # id -> genres
+
+    def _build(self):
+        self.bitmaps = {}
+        self.tagged = {}
+        for id, genres in self.session.query(self.model.id, self.model.genres):
+            self.add(id, genres)
+
+    def add(self, id, genres):
+        if self.bitmaps is None:
+            return
+        self.remove(id)
+        self.tagged[id] = genres = selected_genres(genres or [])
+        for genre in genres:
+            self.bitmaps[genre] = self.bitmaps.get(genre, 0) | (1 << id)
+
+    def remove(self, id):
+        # Also called by delete_venue: bulk Query.delete() doesn't fire mapper events
+        if self.bitmaps is None or id not in self.tagged:
+            return
+        for genre in self.tagged.pop(id):
+            self.bitmaps[genre] &= ~(1 << id)
+            if not self.bitmaps[genre]:
+                del self.bitmaps[genre]
+
+    def changed(self, target):
+        self.add(target.id, target.genres)
+
+    def _matching(self, genres):
+        # Bitmap of ids tagged with every genre, or None for no restriction
+        if self.bitmaps is None:
+            self._build()
+        mask = None
+        for genre in genres:
+            bitmap = self.bitmaps.get(genre, 0)
+            mask = bitmap if mask is None else mask & bitmap
+        return mask
+
+    def filter(self, query, genres):
+        mask = self._matching(genres)
+        if mask is None:
+            return query
+        bits = bin(mask)[:1:-1]  # bit <id> is character <id>
+        ids, id = [], bits.find('1')
+        while id != -1:
+            ids.append(str(id))
+            id = bits.find('1', id + 1)
+        if not ids:
+            return query.filter(false())
+        # Only ints from the bitmap go into the SQL text
+        return query.filter(text('%s.id IN (%s)' % (self.model.__tablename__, ','.join(ids))))
+
+    def keep(self, ids, genres):
+        mask = self._matching(genres)
+        return list(ids) if mask is None else [id for id in ids if mask >> id & 1]
+
+    def facets(self, genres=(), ids=None):
+        mask = self._matching(genres)
+        if ids is not None:
+            only = 0
+            for id in ids:
+                only |= 1 << id
+            mask = only if mask is None else mask & only
+        counts = {}
+        for genre, bitmap in self.bitmaps.items():
+            counts[genre] = bin(bitmap if mask is None else bitmap & mask).count('1')
+        return ordered_facets(counts, genres)
+
+
+def make_genres(db, model, uri):
+    # Picks the backend from the database URI, like make_search
+    if uri.startswith('postgres'):
+        return PostgresGenres(db.session, model)
+    return LocalGenres(db.session, model)
@@ -0,0 +1,74 @@
+import functools
+import hashlib
+from datetime import datetime, timezone
+
+from flask import g, make_response, request, session, Response
+from werkzeug.http import is_resource_modified
+
+#----------------------------------------------------------------------------#
+# HTTP caching.
+#
+# conditional() answers If-None-Match / If-Modified-Since from a cheap
+# validator query before the view builds anything, and stamps ETag and
+# Last-Modified on full responses. Cache-Control comes from the per-endpoint
+# CACHE_CONTROL policy in config. The validator is kept on g for the view, so
+# page data cached by another state of the page is rebuilt, not served under
+# the new ETag.
+#----------------------------------------------------------------------------#
+
+
+def http_date(value):
+    # Validators are naive local times, like the rest of the app's datetimes
+    return value.astimezone(timezone.utc) if value.tzinfo is None else value
+
+
+def validator_digest():
+    # Identifies the state conditional() validated for this request, or None
+    parts = g.get('validator')
+    return None if parts is None else hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def conditional(validator):
+    # validator(**view_args) returns the values the page depends on, or None to skip
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(**kwargs):
+            parts = g.validator = validator(**kwargs)
+            if '_flashes' in session:
+                # The page carries one-off messages; never cache or revalidate it
+                response = make_response(view(**kwargs))
+                response.headers['Cache-Control'] = 'no-store'
+                return response
+            if parts is None:
+                return view(**kwargs)
+            times = [p for p in parts if isinstance(p, datetime)]
+            lastModified = http_date(max(times)).replace(microsecond=0) if times else None
+            if any(p is not None and not isinstance(p, datetime) for p in parts):
+                # A part that isn't a time (a count, a digest) can change without moving a
+                # date forward; If-Modified-Since alone would then answer 304, so only the
+                # ETag is offered
+                lastModified = None
+            etag = hashlib.sha1(repr((request.endpoint, kwargs, request.query_string, parts))
+                                .encode('utf-8')).hexdigest()
+            if not is_resource_modified(request.environ, etag=etag, last_modified=lastModified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(**kwargs))
+            response.set_etag(etag)
+            if lastModified is not None:
+                response.last_modified = lastModified
+            return response
+        return wrapped
+    return decorator
+
+
+def init_http_caching(app):
+    policies = app.config.get('CACHE_CONTROL', {})
+
+    @app.after_request
+    def cache_control(response):
+        policy = policies.get(request.endpoint)
+        if policy and request.method in ('GET', 'HEAD') and response.status_code in (200, 304) \
+                and 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = policy
+        return response
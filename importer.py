@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import dateutil.parser
+from sqlalchemy import ARRAY, Boolean, DateTime, Integer, func, select, text
+
+#----------------------------------------------------------------------------#
+# Bulk import.
+#
+# Streams CSV or JSON Lines records into a table in batches, one transaction
+# per batch. Postgres batches go through COPY, everything else through an
+# executemany INSERT. A failing batch is rolled back and reported without
+# stopping the rest of the import.
+#----------------------------------------------------------------------------#
+
+
+def read_records(stream, format):
+    if format == 'csv':
+        for record in csv.DictReader(stream):
+            yield record
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def convert(column, value):
+    # CSV hands us strings; JSON may already have the right types
+    if value is None or value == '':
+        return None
+    if isinstance(column.type, ARRAY):
+        if isinstance(value, str):
+            return [v.strip() for v in value.split(';') if v.strip()]
+        return list(value)
+    if isinstance(column.type, Boolean):
+        if isinstance(value, str):
+            return value.strip().lower() in ('1', 't', 'true', 'y', 'yes')
+        return bool(value)
+    if isinstance(column.type, Integer):
+        return int(value)
+    if isinstance(column.type, DateTime):
+        return value if isinstance(value, datetime) else dateutil.parser.parse(value)
+    return value
+
+
+def fill_defaults(table, row):
+    # Rows in one batch share a column list, so a NOT NULL column one record leaves out
+    # would be written as NULL; give it the column's own default instead
+    for column in table.columns:
+        if row.get(column.name) is None and not column.nullable and \
+                column.default is not None and column.default.is_scalar:
+            row[column.name] = column.default.arg
+    return row
+
+
+def batches(records, table, size, check=None):
+    # Yields (first record number, rows, errors) with rows keyed by column name
+    # check(row) may return a reason to reject a converted row
+    rows, errors, first = [], [], 1
+    for number, record in enumerate(records, 1):
+        try:
+            row = fill_defaults(table, dict((key, convert(table.c[key], value))
+                                            for key, value in record.items() if key in table.c))
+            problem = check(row) if check else None
+            if problem:
+                errors.append('record %d: %s' % (number, problem))
+            else:
+                rows.append(row)
+        except (ValueError, OverflowError) as e:
+            errors.append('record %d: %s' % (number, e))
+        if number - first + 1 >= size:
+            yield first, rows, errors
+            rows, errors, first = [], [], number + 1
+    if rows or errors:
+        yield first, rows, errors
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, list):
+        return '{' + ','.join('"%s"' % v.replace('\\', '\\\\').replace('"', '\\"') for v in value) + '}'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(connection, table, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([copy_value(row.get(c)) for c in columns])
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    cursor.copy_expert('COPY %s (%s) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')' % (
+        table.name, ', '.join(columns)), buffer)
+
+
+def insert_rows(connection, table, columns, rows):
+    connection.execute(table.insert(), [
+        dict((c, row.get(c)) for c in columns) for row in rows])
+
+
+def import_records(engine, table, records, batch_size=1000, echo=print, check=None):
+    # Returns (imported row count, list of failure descriptions)
+    write = copy_rows if engine.dialect.name == 'postgresql' else insert_rows
+    imported, failures, explicitIds = 0, [], False
+    for number, (first, rows, errors) in enumerate(batches(records, table, batch_size, check), 1):
+        last = first + len(rows) + len(errors) - 1
+        failures.extend('batch %d: %s' % (number, e) for e in errors)
+        if not rows:
+            continue
+        columns = [c.name for c in table.columns if any(c.name in r for r in rows)]
+        explicitIds = explicitIds or 'id' in columns
+        try:
+            with engine.begin() as connection:
+                write(connection, table, columns, rows)
+            imported += len(rows)
+        except Exception as e:
+            failures.append('batch %d (records %d-%d) rolled back: %s' % (
+                number, first, last, str(e).strip().splitlines()[0]))
+        echo('%s: %d imported, %d failed, through record %d' % (
+            table.name, imported, len(failures), last))
+    if explicitIds and engine.dialect.name == 'postgresql':
+        # Rows inserted with their own ids don't advance the sequence
+        with engine.begin() as connection:
+            maxId = connection.execute(select([func.max(table.c.id)])).scalar()
+            if maxId is not None:
+                connection.execute(text("SELECT setval(pg_get_serial_sequence(:t, 'id'), :v)"),
+                                   t=table.name, v=maxId)
+    return imported, failures
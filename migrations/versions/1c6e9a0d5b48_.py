@@ -0,0 +1,27 @@
+"""add row version columns to venues, artists and shows
+
+Revision ID: 1c6e9a0d5b48
+Revises: e5a8f1c3b726
+Create Date: 2026-10-18 15:46:27.530418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c6e9a0d5b48'
+down_revision = 'e5a8f1c3b726'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('venues', 'artists', 'shows'):
+        op.add_column(table, sa.Column('version', sa.Integer(),
+                                       nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in ('shows', 'artists', 'venues'):
+        op.drop_column(table, 'version')
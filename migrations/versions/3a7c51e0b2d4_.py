@@ -0,0 +1,27 @@
+"""add shows (venue_id, start_time) and (artist_id, start_time) indexes
+
+Revision ID: 3a7c51e0b2d4
+Revises: fbcddc762845
+Create Date: 2026-10-18 10:02:11.481220
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7c51e0b2d4'
+down_revision = 'fbcddc762845'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_shows_venue_id_start_time', 'shows',
+                    ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_shows_artist_id_start_time', 'shows',
+                    ['artist_id', 'start_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_shows_artist_id_start_time', table_name='shows')
+    op.drop_index('ix_shows_venue_id_start_time', table_name='shows')
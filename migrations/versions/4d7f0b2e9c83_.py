@@ -0,0 +1,29 @@
+"""add updated_at timestamps to venues, artists and shows
+
+Revision ID: 4d7f0b2e9c83
+Revises: 1c6e9a0d5b48
+Create Date: 2026-10-18 16:12:05.284913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d7f0b2e9c83'
+down_revision = '1c6e9a0d5b48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('venues', 'artists', 'shows'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                       server_default=sa.func.now()))
+        op.create_index(op.f('ix_%s_updated_at' % table), table, ['updated_at'], unique=False)
+
+
+def downgrade():
+    for table in ('shows', 'artists', 'venues'):
+        op.drop_index(op.f('ix_%s_updated_at' % table), table_name=table)
+        op.drop_column(table, 'updated_at')
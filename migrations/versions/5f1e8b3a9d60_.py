@@ -0,0 +1,33 @@
+"""add pg_trgm GIN indexes on venue and artist names
+
+Revision ID: 5f1e8b3a9d60
+Revises: c2d90a4f7e31
+Create Date: 2026-10-18 12:05:19.640771
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1e8b3a9d60'
+down_revision = 'c2d90a4f7e31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trigram indexes only exist on Postgres; other backends search in-process
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_venues_name_trgm', 'venues', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_artists_name_trgm', 'artists', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_artists_name_trgm', table_name='artists')
+    op.drop_index('ix_venues_name_trgm', table_name='venues')
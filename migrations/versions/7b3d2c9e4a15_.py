@@ -0,0 +1,49 @@
+"""add upcoming/past show counters to venues and artists
+
+Revision ID: 7b3d2c9e4a15
+Revises: 5f1e8b3a9d60
+Create Date: 2026-10-18 14:12:08.305927
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3d2c9e4a15'
+down_revision = '5f1e8b3a9d60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('venues', 'artists'):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(),
+                                       nullable=False, server_default='0'))
+        op.add_column(table, sa.Column('past_shows_count', sa.Integer(),
+                                       nullable=False, server_default='0'))
+    op.create_table('show_counter_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rolled_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Backfill against the same watermark the counters are rolled from
+    now = datetime.now()
+    for table, column in (('venues', 'venue_id'), ('artists', 'artist_id')):
+        op.get_bind().execute(sa.text(
+            'UPDATE {table} SET '
+            'upcoming_shows_count = (SELECT count(*) FROM shows WHERE shows.{column} = {table}.id AND shows.start_time > :now), '
+            'past_shows_count = (SELECT count(*) FROM shows WHERE shows.{column} = {table}.id AND shows.start_time <= :now)'
+            .format(table=table, column=column)), now=now)
+    op.get_bind().execute(sa.text(
+        'INSERT INTO show_counter_state (id, rolled_at) VALUES (1, :now)'), now=now)
+
+
+def downgrade():
+    op.drop_table('show_counter_state')
+    for table in ('artists', 'venues'):
+        op.drop_column(table, 'past_shows_count')
+        op.drop_column(table, 'upcoming_shows_count')
@@ -0,0 +1,32 @@
+"""add GIN indexes on venue and artist genres
+
+Revision ID: 8a2c6e4f1d39
+Revises: 4d7f0b2e9c83
+Create Date: 2026-10-18 18:40:52.117604
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8a2c6e4f1d39'
+down_revision = '4d7f0b2e9c83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serve genres @> ARRAY[...] filters; other backends filter in-process
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_index('ix_venues_genres', 'venues', ['genres'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_artists_genres', 'artists', ['genres'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_artists_genres', table_name='artists')
+    op.drop_index('ix_venues_genres', table_name='venues')
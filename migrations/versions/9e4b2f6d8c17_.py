@@ -0,0 +1,24 @@
+"""add venues (state, city) index
+
+Revision ID: 9e4b2f6d8c17
+Revises: 3a7c51e0b2d4
+Create Date: 2026-10-18 10:41:53.902114
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b2f6d8c17'
+down_revision = '3a7c51e0b2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_venues_state_city', 'venues',
+                    ['state', 'city'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_venues_state_city', table_name='venues')
@@ -0,0 +1,34 @@
+"""sort the venue and artist listings on coalesced text
+
+Revision ID: b6f0d3a2c845
+Revises: 8a2c6e4f1d39
+Create Date: 2026-10-18 21:05:31.402716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f0d3a2c845'
+down_revision = '8a2c6e4f1d39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keyset_page compares coalesce(col, '') so NULLs don't end the pager
+    op.drop_index('ix_artists_name_id', table_name='artists')
+    op.create_index('ix_artists_name_id', 'artists',
+                    [sa.text("coalesce(name, '')"), 'id'], unique=False)
+    op.drop_index('ix_venues_state_city', table_name='venues')
+    op.create_index('ix_venues_area_name_id', 'venues',
+                    [sa.text("coalesce(state, '')"), sa.text("coalesce(city, '')"),
+                     sa.text("coalesce(name, '')"), 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_venues_area_name_id', table_name='venues')
+    op.create_index('ix_venues_state_city', 'venues', ['state', 'city'], unique=False)
+    op.drop_index('ix_artists_name_id', table_name='artists')
+    op.create_index('ix_artists_name_id', 'artists', ['name', 'id'], unique=False)
@@ -0,0 +1,27 @@
+"""add keyset pagination indexes on shows and artists
+
+Revision ID: c2d90a4f7e31
+Revises: 9e4b2f6d8c17
+Create Date: 2026-10-18 11:27:40.118305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d90a4f7e31'
+down_revision = '9e4b2f6d8c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_shows_start_time_id', 'shows',
+                    ['start_time', 'id'], unique=False)
+    op.create_index('ix_artists_name_id', 'artists',
+                    ['name', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_artists_name_id', table_name='artists')
+    op.drop_index('ix_shows_start_time_id', table_name='shows')
@@ -0,0 +1,32 @@
+"""record the last delete per table for the listing validators
+
+Revision ID: c7e1a94b2d60
+Revises: b6f0d3a2c845
+Create Date: 2026-10-18 21:48:12.650391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1a94b2d60'
+down_revision = 'b6f0d3a2c845'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('delete_marks',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    # Every existing listing validator changes once, which is harmless
+    for table in ('venues', 'artists', 'shows'):
+        op.get_bind().execute(sa.text(
+            'INSERT INTO delete_marks (table_name, deleted_at) VALUES (:t, now())'), t=table)
+
+
+def downgrade():
+    op.drop_table('delete_marks')
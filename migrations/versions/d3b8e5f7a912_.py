@@ -0,0 +1,26 @@
+"""add the keyset index for the venues API listing
+
+Revision ID: d3b8e5f7a912
+Revises: c7e1a94b2d60
+Create Date: 2026-10-18 22:31:07.918264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b8e5f7a912'
+down_revision = 'c7e1a94b2d60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # /api/v1/venues pages on (name, id); name sorts as coalesce(name, '') like the other listings
+    op.create_index('ix_venues_name_id', 'venues',
+                    [sa.text("coalesce(name, '')"), 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_venues_name_id', table_name='venues')
@@ -0,0 +1,39 @@
+"""add shows.duration and double-booking exclusion constraints
+
+Revision ID: e5a8f1c3b726
+Revises: 7b3d2c9e4a15
+Create Date: 2026-10-18 15:03:44.872160
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a8f1c3b726'
+down_revision = '7b3d2c9e4a15'
+branch_labels = None
+depends_on = None
+
+SHOW_PERIOD = "tsrange(start_time, start_time + duration * interval '1 minute')"
+
+
+def upgrade():
+    op.add_column('shows', sa.Column('duration', sa.Integer(),
+                                     nullable=False, server_default='120'))
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # btree_gist lets the integer ids share a GiST index with the time range.
+    # Existing overlapping shows must be resolved before this will apply
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute('ALTER TABLE shows ADD CONSTRAINT shows_venue_no_overlap '
+               'EXCLUDE USING gist (venue_id WITH =, %s WITH &&)' % SHOW_PERIOD)
+    op.execute('ALTER TABLE shows ADD CONSTRAINT shows_artist_no_overlap '
+               'EXCLUDE USING gist (artist_id WITH =, %s WITH &&)' % SHOW_PERIOD)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('shows_artist_no_overlap', 'shows')
+        op.drop_constraint('shows_venue_no_overlap', 'shows')
+    op.drop_column('shows', 'duration')
@@ -0,0 +1,107 @@
+
+from sqlalchemy import func
+
+from extensions import db
+
+#----------------------------------------------------------------------------#
+# Models.
+#----------------------------------------------------------------------------#
+
+
+class Venue(db.Model):
+    __tablename__ = 'venues'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    address = db.Column(db.String(120))
+    genres = db.Column(db.ARRAY(db.String(120)))
+    phone = db.Column(db.String(120))
+    image_link = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(120))
+    seeking_talent = db.Column(db.Boolean)
+    seeking_description = db.Column(db.String())
+    # Maintained by create_show_submission, delete_venue and roll-show-counters
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    version = db.Column(db.Integer, nullable=False, server_default='1')  # bumped on every ORM update
+    # The database's clock, as for COPY imports and the migration backfill: catch-up
+    # watermarks compare these across writers, so one host's clock can't run ahead
+    updated_at = db.Column(db.DateTime, nullable=False, default=func.now(),
+                           onupdate=func.now(), server_default=func.now(), index=True)
+    children = db.relationship(
+        'Show', backref="venues", cascade='all, delete', lazy=True)
+    __mapper_args__ = {'version_id_col': version}
+
+
+class Show(db.Model):
+    __tablename__ = "shows"
+    __table_args__ = (
+        db.Index('ix_shows_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_shows_artist_id_start_time', 'artist_id', 'start_time'),
+        db.Index('ix_shows_start_time_id', 'start_time', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    venue_id = db.Column(db.Integer, db.ForeignKey('venues.id'))
+    artist_id = db.Column(db.Integer, db.ForeignKey('artists.id'))
+    start_time = db.Column(db.DateTime)
+    duration = db.Column(db.Integer, nullable=False,
+                         default=120, server_default='120')  # minutes
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=False, default=func.now(),
+                           onupdate=func.now(), server_default=func.now(), index=True)
+    __mapper_args__ = {'version_id_col': version}
+
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate
+
+
+class Artist(db.Model):
+    __tablename__ = 'artists'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    genres = db.Column(db.ARRAY(db.String(120)))
+    image_link = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(120))
+    seeking_venue = db.Column(db.Boolean, default=False)
+    seeking_description = db.Column(db.String(120))
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=False, default=func.now(),
+                           onupdate=func.now(), server_default=func.now(), index=True)
+    children = db.relationship(
+        'Show', cascade='all, delete', backref='artist', lazy=True)
+    __mapper_args__ = {'version_id_col': version}
+
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate
+
+# TODO Implement Show and Artist models, and complete all model relationships and properties, as a database migration.
+
+
+# The listings sort nullable text through coalesce() (see queries.sort_key), so
+# their keyset indexes are on the same expressions
+db.Index('ix_venues_area_name_id', func.coalesce(Venue.state, ''), func.coalesce(Venue.city, ''),
+         func.coalesce(Venue.name, ''), Venue.id)
+db.Index('ix_artists_name_id', func.coalesce(Artist.name, ''), Artist.id)
+db.Index('ix_venues_name_id', func.coalesce(Venue.name, ''), Venue.id)  # /api/v1/venues
+
+
+class DeleteMark(db.Model):
+    # One row per table: when a row was last deleted from it, which no updated_at can show
+    __tablename__ = 'delete_marks'
+    table_name = db.Column(db.String(64), primary_key=True)
+    deleted_at = db.Column(db.DateTime, nullable=False)
+
+
+class ShowCounterState(db.Model):
+    # Single row: shows starting after rolled_at are counted as upcoming
+    __tablename__ = 'show_counter_state'
+    id = db.Column(db.Integer, primary_key=True)
+    rolled_at = db.Column(db.DateTime, nullable=False)
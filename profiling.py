@@ -0,0 +1,115 @@
+import re
+import threading
+import time
+
+from flask import current_app, g, has_app_context, jsonify, request, abort
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------------#
+# Per-request SQL profiling.
+#
+# Counts the statements each request runs and the time spent in them, adds a
+# Server-Timing header, logs requests over the configured thresholds, and
+# keeps per-fingerprint totals for the /debug/queries page.
+#----------------------------------------------------------------------------#
+
+MAX_FINGERPRINTS = 1000
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_in_lists = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_spaces = re.compile(r'\s+')
+
+
+def fingerprint(statement):
+    # Literals and placeholders become "?" so the same query shape groups together
+    statement = statement.replace('%s', '?')
+    statement = re.sub(r'%\(\w+\)s|:\w+', '?', statement)
+    statement = _literals.sub('?', statement)
+    statement = _in_lists.sub('(?+)', statement)
+    return _spaces.sub(' ', statement).strip()
+
+
+class QueryStats(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = {}  # fingerprint -> [count, total seconds, max seconds]
+
+    def record(self, statement, elapsed):
+        key = fingerprint(statement)
+        with self.lock:
+            entry = self.totals.get(key)
+            if entry is None:
+                if len(self.totals) >= MAX_FINGERPRINTS:
+                    return
+                entry = self.totals[key] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+    def top(self, limit, by):
+        with self.lock:
+            items = list(self.totals.items())
+        index = {'count': 0, 'total': 1, 'max': 2}[by]
+        items.sort(key=lambda item: item[1][index], reverse=True)
+        return [{
+            'fingerprint': key,
+            'count': count,
+            'total_ms': round(total * 1000, 3),
+            'avg_ms': round(total * 1000 / count, 3),
+            'max_ms': round(longest * 1000, 3)
+        } for key, (count, total, longest) in items[:limit]]
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    if not has_app_context() or 'query_stats' not in current_app.extensions:
+        return
+    current_app.extensions['query_stats'].record(statement, elapsed)
+    # Per context; fanout adds its workers' totals to the request's when they finish
+    g.sql_statements = g.get('sql_statements', 0) + 1
+    g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+
+
+def init_profiling(app):
+    stats = app.extensions['query_stats'] = QueryStats()
+    maxStatements = app.config.get('SLOW_REQUEST_STATEMENTS', 20)
+    maxMs = app.config.get('SLOW_REQUEST_MS', 500)
+    # Registered once for every engine, however many apps are created; statements
+    # are counted against the app whose context runs them
+    if not event.contains(Engine, 'after_cursor_execute', after_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_request_queries(response):
+        count = g.get('sql_statements', 0)
+        dbMs = g.get('sql_seconds', 0.0) * 1000
+        totalMs = (time.perf_counter() - g.get('request_started', time.perf_counter())) * 1000
+        response.headers.add('Server-Timing', 'db;dur=%.1f;desc="%d queries"' % (dbMs, count))
+        response.headers.add('Server-Timing', 'app;dur=%.1f' % totalMs)
+        if count > maxStatements or totalMs > maxMs:
+            app.logger.warning('Slow request %s %s: %d statements, %.1f ms in DB, %.1f ms total' % (
+                request.method, request.full_path.rstrip('?'), count, dbMs, totalMs))
+        return response
+
+    @app.route('/debug/queries')
+    def debug_queries():
+        # Busiest query shapes in this worker since it started
+        if not (app.debug or app.config.get('SQL_DEBUG_PAGE')):
+            abort(404)
+        by = request.args.get('by', 'total')
+        if by not in ('count', 'total', 'max'):
+            abort(400)
+        return jsonify(stats.top(request.args.get('limit', 25, type=int), by))
+
+    return stats
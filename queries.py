@@ -0,0 +1,313 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from flask import abort, current_app
+from sqlalchemy import bindparam, case, func, literal_column, tuple_
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import Artist, DeleteMark, Show, ShowCounterState, Venue
+
+#----------------------------------------------------------------------------#
+# Queries.
+#----------------------------------------------------------------------------#
+
+
+def show_counts(column, entity_id):
+    # Returns (past, upcoming) show counts for one venue or artist in a single COUNT
+    # column is Show.venue_id or Show.artist_id
+    now = datetime.now()
+    past, upcoming = db.session.query(
+        func.count(case([(Show.start_time <= now, 1)])),
+        func.count(case([(Show.start_time > now, 1)]))
+    ).filter(column == entity_id).one()
+    return past, upcoming
+
+
+def upcoming_counters(model, ids):
+    # Returns {id: upcoming show count} for many venues or artists from the counter columns
+    if not ids:
+        return {}
+    return dict(db.session.query(model.id, model.upcoming_shows_count).filter(
+        model.id.in_(ids)))
+
+
+def counter_state(lock=None):
+    # lock is 'share' while counting a new show, 'update' while rolling the watermark
+    query = db.session.query(ShowCounterState)
+    if lock:
+        query = query.with_for_update(read=lock == 'share')
+    state = query.get(1)
+    if state is None:
+        state = ShowCounterState(id=1, rolled_at=datetime.now())
+        db.session.add(state)
+        db.session.flush()
+    return state
+
+
+def count_show(venue_id, artist_id, start_time, delta=1):
+    # Adds (or with delta=-1 removes) one show from its venue's and artist's counters
+    rolledAt = counter_state(lock='share').rolled_at
+    column = 'upcoming_shows_count' if start_time > rolledAt else 'past_shows_count'
+    for model, id in ((Venue, venue_id), (Artist, artist_id)):
+        db.session.query(model).filter(model.id == id).update(
+            {column: getattr(model, column) + delta}, synchronize_session=False)
+
+
+def uncount_venue_shows(venue_id):
+    # Takes a venue's shows off its artists' counters before the shows are deleted
+    rolledAt = counter_state(lock='share').rolled_at
+    rows = db.session.query(
+        Show.artist_id,
+        func.count(case([(Show.start_time > rolledAt, 1)])),
+        func.count(case([(Show.start_time <= rolledAt, 1)]))
+    ).filter(Show.venue_id == venue_id, Show.artist_id != None).group_by(Show.artist_id).all()
+    if rows:
+        artists = Artist.__table__
+        db.session.execute(artists.update().where(artists.c.id == bindparam('key')).values(
+            upcoming_shows_count=artists.c.upcoming_shows_count - bindparam('upcoming'),
+            past_shows_count=artists.c.past_shows_count - bindparam('past')
+        ), [{'key': key, 'upcoming': upcoming, 'past': past} for key, upcoming, past in rows])
+
+
+def roll_show_counters(now=None):
+    # Moves shows that started since the last roll from the upcoming to the past counters
+    state = counter_state(lock='update')
+    now = now or datetime.now()
+    moved = 0
+    for model, column in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        rows = db.session.query(column, func.count(Show.id)).filter(
+            Show.start_time > state.rolled_at, Show.start_time <= now,
+            column != None).group_by(column).all()
+        if rows:
+            table = model.__table__
+            db.session.execute(table.update().where(table.c.id == bindparam('key')).values(
+                upcoming_shows_count=table.c.upcoming_shows_count - bindparam('n'),
+                past_shows_count=table.c.past_shows_count + bindparam('n')
+            ), [{'key': key, 'n': n} for key, n in rows])
+            moved += sum(n for _, n in rows)
+    state.rolled_at = now
+    db.session.commit()
+    return moved
+
+
+def counter_mismatches(model, column):
+    # Rows whose counters disagree with the shows table: (id, stored, actual) pairs
+    rolledAt = counter_state().rolled_at
+    truth = db.session.query(
+        column.label('key'),
+        func.count(case([(Show.start_time > rolledAt, 1)])).label('upcoming'),
+        func.count(case([(Show.start_time <= rolledAt, 1)])).label('past')
+    ).group_by(column).subquery()
+    upcoming = func.coalesce(truth.c.upcoming, 0)
+    past = func.coalesce(truth.c.past, 0)
+    return db.session.query(
+        model.id, model.upcoming_shows_count, model.past_shows_count, upcoming, past
+    ).outerjoin(truth, truth.c.key == model.id).filter(db.or_(
+        model.upcoming_shows_count != upcoming, model.past_shows_count != past)).all()
+
+
+def reconcile_counters(fix=False, echo=print):
+    # Compares every counter with a GROUP BY over shows; with fix, overwrites the wrong ones
+    total = 0
+    for model, column in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        rows = counter_mismatches(model, column)
+        total += len(rows)
+        for id, upcoming, past, trueUpcoming, truePast in rows[:20]:
+            echo('%s %d: upcoming %d (actual %d), past %d (actual %d)' % (
+                model.__tablename__, id, upcoming, trueUpcoming, past, truePast))
+        if len(rows) > 20:
+            echo('%s: %d more mismatches' % (model.__tablename__, len(rows) - 20))
+        if fix and rows:
+            table = model.__table__
+            db.session.execute(table.update().where(table.c.id == bindparam('key')).values(
+                upcoming_shows_count=bindparam('upcoming'), past_shows_count=bindparam('past')
+            ), [{'key': r[0], 'upcoming': r[3], 'past': r[4]} for r in rows])
+    if fix:
+        db.session.commit()
+    return total
+
+
+def venue_areas():
+    # Every venue with its upcoming show count; ordering is left to the pager
+    return db.session.query(
+        Venue.id, Venue.name, Venue.city, Venue.state,
+        Venue.upcoming_shows_count.label('num_upcoming_shows'))
+
+
+def encode_cursor(values):
+    # Opaque, URL safe cursor holding the sort key of a boundary row
+    return base64.urlsafe_b64encode(json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values]).encode()).decode()
+
+
+def sort_key(column):
+    # A NULL makes the whole row comparison NULL and would end the pager at that row,
+    # so nullable text sorts as ''; the listing indexes are on the same expressions
+    if column.nullable and isinstance(column.type, db.String):
+        return func.coalesce(column, literal_column("''"))
+    return column
+
+
+def sort_values(values, columns):
+    # A row's values as sort_key() compares them, for its cursor
+    return ['' if v is None and sort_key(c) is not c else v for v, c in zip(values, columns)]
+
+
+def cursor_value(value, column):
+    # One decoded cursor value, checked against its sort column's type
+    if value is None:
+        raise ValueError('null cursor value')
+    if isinstance(column.type, db.DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, db.Integer) and (not isinstance(value, int) or isinstance(value, bool)):
+        raise TypeError('integer expected')
+    if isinstance(column.type, db.String) and not isinstance(value, str):
+        raise TypeError('string expected')
+    return value
+
+
+def decode_cursor(cursor, columns):
+    # Cursors come from the client, so anything that isn't a sort key of the right types is a 400
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError('wrong cursor length')
+        return [cursor_value(v, c) for v, c in zip(values, columns)]
+    except (ValueError, TypeError):
+        abort(400)
+
+
+def keyset_page(query, columns, key, after=None, before=None, per_page=None):
+    # Seeks from the cursor on the sort key instead of using OFFSET, so deep pages cost the same as page one
+    # columns is the sort key (ending in a unique id, NOT NULL apart from text), key(row)
+    # returns those values for a row
+    per_page = per_page or current_app.config['PER_PAGE']
+    sortKeys = [sort_key(c) for c in columns]
+    if before:
+        values = decode_cursor(before, columns)
+        rows = query.filter(tuple_(*sortKeys) < tuple_(*values)).order_by(
+            *[c.desc() for c in sortKeys]).limit(per_page + 1).all()
+        hasPrev, hasNext = len(rows) > per_page, True
+        rows = rows[:per_page][::-1]
+    else:
+        if after:
+            query = query.filter(tuple_(*sortKeys) >
+                                 tuple_(*decode_cursor(after, columns)))
+        rows = query.order_by(*sortKeys).limit(per_page + 1).all()
+        hasPrev, hasNext = after is not None, len(rows) > per_page
+        rows = rows[:per_page]
+    return {
+        'items': rows,
+        'next': encode_cursor(sort_values(key(rows[-1]), columns)) if rows and hasNext else None,
+        'prev': encode_cursor(sort_values(key(rows[0]), columns)) if rows and hasPrev else None
+    }
+
+
+def venue_cache_keys(venue_id):
+    # A venue's name and image also appear on the page of every artist who played there
+    artistIds = db.session.query(Show.artist_id).filter(
+        Show.venue_id == venue_id).distinct()
+    return ['venue:%s' % venue_id] + ['artist:%s' % id for id, in artistIds]
+
+
+def artist_cache_keys(artist_id):
+    venueIds = db.session.query(Show.venue_id).filter(
+        Show.artist_id == artist_id).distinct()
+    return ['artist:%s' % artist_id] + ['venue:%s' % id for id, in venueIds]
+
+
+def schedule_conflicts(venue_id, artist_id, start, duration):
+    # Only shows starting less than SHOW_MAX_DURATION before this one can overlap it,
+    # so the (venue_id, start_time) and (artist_id, start_time) indexes bound the scan
+    from booking import BookingIndex
+    end = start + timedelta(minutes=duration)
+    nearby = db.session.query(Show.venue_id, Show.artist_id, Show.start_time, Show.duration).filter(
+        db.or_(Show.venue_id == venue_id, Show.artist_id == artist_id),
+        Show.start_time > start - timedelta(minutes=current_app.config['SHOW_MAX_DURATION']),
+        Show.start_time < end)
+    index = BookingIndex()
+    for show in nearby:
+        index.add(show.venue_id, show.artist_id, show.start_time, show.duration)
+    return index.conflicts(venue_id, artist_id, start, duration)
+
+
+def booking_index():
+    # Every scheduled show, for checking a bulk load without a query per record
+    from booking import BookingIndex
+    index = BookingIndex()
+    rows = db.session.query(Show.venue_id, Show.artist_id, Show.start_time, Show.duration).filter(
+        Show.start_time != None).yield_per(10000)
+    for show in rows:
+        index.add(show.venue_id, show.artist_id, show.start_time, show.duration)
+    return index
+
+
+def page_last_modified(model, entity_id, column, other, otherColumn):
+    # Everything a venue/artist page depends on, in one statement: the row itself, its
+    # shows, the other side of those shows, and the latest show to have started (which
+    # moved from upcoming to past)
+    shows = column == entity_id
+    row = db.session.query(
+        model.updated_at,
+        db.session.query(func.max(Show.updated_at)).filter(shows).as_scalar(),
+        db.session.query(func.max(Show.start_time)).filter(
+            shows, Show.start_time <= datetime.now()).as_scalar(),
+        db.session.query(func.max(other.updated_at)).join(
+            Show, otherColumn == other.id).filter(shows).as_scalar()
+    ).filter(model.id == entity_id).first()
+    return None if row is None else tuple(row)
+
+
+def venue_last_modified(venue_id):
+    return page_last_modified(Venue, venue_id, Show.venue_id, Artist, Show.artist_id)
+
+
+def artist_last_modified(artist_id):
+    return page_last_modified(Artist, artist_id, Show.artist_id, Venue, Show.venue_id)
+
+
+def mark_deleted(*models):
+    # Call in the deleting transaction; listing validators read the mark
+    names = [model.__tablename__ for model in models]
+    marked = db.session.query(DeleteMark).filter(DeleteMark.table_name.in_(names)).update(
+        {'deleted_at': func.now()}, synchronize_session=False)
+    if marked < len(names):
+        found = set(name for name, in db.session.query(DeleteMark.table_name).filter(
+            DeleteMark.table_name.in_(names)))
+        db.session.add_all([DeleteMark(table_name=name, deleted_at=func.now())
+                            for name in names if name not in found])
+        db.session.flush()
+
+
+def listing_last_modified(*models):
+    # Latest change per table and the latest delete from any of them; each is an index
+    # lookup, so a validation costs the same however large the tables grow
+    columns = [db.session.query(func.max(model.updated_at)).as_scalar() for model in models]
+    columns.append(db.session.query(func.max(DeleteMark.deleted_at)).filter(
+        DeleteMark.table_name.in_([model.__tablename__ for model in models])).as_scalar())
+    return tuple(db.session.query(*columns).one())
+
+
+def upcoming_shows_query(column, entity_id, query=None):
+    # Unexecuted, so the API can run it over just the version columns
+    query = db.session.query(Show) if query is None else query
+    return query.filter(column == entity_id, Show.start_time > datetime.now()).order_by(Show.start_time)
+
+
+def upcoming_shows(column, entity_id, related):
+    # Upcoming shows for a venue or artist, with the other side of each show joined in
+    return upcoming_shows_query(column, entity_id).options(joinedload(related)).all()
+
+
+def past_shows_query(column, entity_id, query=None, limit=None):
+    limit = limit or current_app.config['PAST_SHOWS_LIMIT']
+    query = db.session.query(Show) if query is None else query
+    return query.filter(column == entity_id, Show.start_time <= datetime.now()).order_by(
+        Show.start_time.desc()).limit(limit)
+
+
+def past_shows(column, entity_id, related, limit=None):
+    # Most recent past shows first, capped so old venues don't stream their whole history
+    return past_shows_query(column, entity_id, limit=limit).options(joinedload(related)).all()
@@ -0,0 +1,59 @@
+import random
+import time
+
+from flask import g, has_app_context, request, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import create_engine, orm
+
+#----------------------------------------------------------------------------#
+# Read replica routing.
+#
+# GET and HEAD requests read from a replica listed in
+# SQLALCHEMY_REPLICA_URIS, as do the POST endpoints listed in
+# REPLICA_READ_ONLY_ENDPOINTS (the search forms). Everything else, flushes,
+# and CLI commands use the primary. After a write, the browser's session is
+# pinned to the primary for REPLICA_READ_YOUR_WRITES_SECONDS so the redirect
+# after a POST sees the change even if the replicas are lagging.
+#----------------------------------------------------------------------------#
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+class RoutingSession(SignallingSession):
+
+    def get_bind(self, mapper=None, clause=None):
+        # g.replica_engine is set per request, and handed to fanout workers explicitly
+        engine = g.get('replica_engine') if has_app_context() else None
+        if engine is not None and not self._flushing:
+            return engine
+        return SignallingSession.get_bind(self, mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+
+    def init_app(self, app):
+        SQLAlchemy.init_app(self, app)
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        # Per app, like the primary engine; db itself is shared by every create_app()
+        app.extensions['replica_engines'] = [create_engine(uri, **options)
+                                             for uri in app.config.get('SQLALCHEMY_REPLICA_URIS', [])]
+        window = app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5)
+        readOnly = set(app.config.get('REPLICA_READ_ONLY_ENDPOINTS', []))
+
+        def is_read():
+            return request.method in READ_METHODS or request.endpoint in readOnly
+
+        @app.before_request
+        def choose_replica():
+            replicas = app.extensions['replica_engines']
+            if replicas and is_read() and session.get('primary_until', 0) < time.time():
+                g.replica_engine = random.choice(replicas)  # one replica per request
+
+        @app.after_request
+        def pin_to_primary(response):
+            if not is_read() and response.status_code < 500:
+                session['primary_until'] = time.time() + window
+            return response
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
@@ -0,0 +1,317 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from flask import _app_ctx_stack
+
+from models import Artist, Show, Venue
+
+#----------------------------------------------------------------------------#
+# In-memory show schedule.
+#
+# Every show is one row in parallel arrays (show id, start, venue, artist,
+# duration). Timelines hold (start, row) pairs sorted by start time: one for
+# all shows, one per city and one per venue, so a calendar range is two
+# binary searches plus a slice, O(log n + k). Venue and artist names are
+# kept alongside so a calendar never needs the database.
+#
+# The index catches up from the database at most every refresh_seconds, and
+# straight away after invalidate(). It reloads the shows, venues and artists
+# whose updated_at moved, so new shows, edited shows and renamed or moved
+# venues all arrive without a rebuild. Rows deleted by other processes
+# disappear at the next full rebuild, every rebuild_seconds. Only the first
+# build runs on a request; later ones load a new ScheduleData on a background
+# thread while the current one keeps serving, and swap it in when done.
+#----------------------------------------------------------------------------#
+
+EPOCH = datetime(1970, 1, 1)
+# Each catch-up looks this far behind the newest updated_at it has seen, for
+# transactions that commit after a later one; reloading a row is idempotent
+CATCH_UP_OVERLAP = timedelta(minutes=1)
+
+
+def to_seconds(value):
+    # Naive datetimes, like the rest of the app, as whole seconds
+    return int((value - EPOCH).total_seconds())
+
+
+def from_seconds(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def city_key(city, state):
+    return ((city or '').strip().lower(), (state or '').strip().lower())
+
+
+class Timeline(object):
+    __slots__ = ('starts', 'rows')
+
+    def __init__(self):
+        self.starts = array('q')
+        self.rows = array('q')
+
+    def append(self, start, row):
+        # Only for loading rows that already arrive in start order
+        self.starts.append(start)
+        self.rows.append(row)
+
+    def add(self, start, row):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.rows.insert(i, row)
+
+    def remove(self, start, row):
+        i = bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.rows[i] == row:
+                del self.starts[i]
+                del self.rows[i]
+                return
+            i += 1
+
+    def between(self, low, high):
+        # Rows starting in [low, high), in start order
+        return self.rows[bisect_left(self.starts, low):bisect_left(self.starts, high)]
+
+
+class ScheduleData(object):
+    # One generation of the index. Rows are only appended; a changed show gets a new
+    # row and its old one is dropped from the timelines.
+
+    def __init__(self):
+        self.showIds, self.starts = array('q'), array('q')
+        self.venueIds, self.artistIds, self.durations = array('q'), array('q'), array('l')
+        self.all = Timeline()
+        self.cities = {}  # city_key -> Timeline
+        self.venueTimelines = {}  # venue id -> Timeline
+        self.venues = {}  # venue id -> (name, city, state)
+        self.artists = {}  # artist id -> name
+        # Show ids in order and each one's current row, -1 once it has left; a dict
+        # would cost several times the five row arrays together
+        self.ids, self.idRows = array('q'), array('q')
+        self.showsSeen = self.venuesSeen = self.artistsSeen = EPOCH
+
+    def _find(self, id):
+        i = bisect_left(self.ids, id)
+        return i if i < len(self.ids) and self.ids[i] == id else None
+
+    def _store(self, id, start, venue_id, artist_id, duration):
+        row = len(self.showIds)
+        self.showIds.append(id)
+        self.starts.append(start)
+        self.venueIds.append(venue_id)
+        self.artistIds.append(artist_id)
+        self.durations.append(duration or 0)
+        return row
+
+    def _place(self, id, row):
+        i = self._find(id)
+        if i is None:
+            i = bisect_left(self.ids, id)  # usually the end: new shows have the highest ids
+            self.ids.insert(i, id)
+            self.idRows.insert(i, row)
+        else:
+            self.idRows[i] = row
+
+    def _unplace(self, id):
+        # Takes a show's current row out of its timelines
+        i = self._find(id)
+        if i is None or self.idRows[i] < 0:
+            return
+        row, self.idRows[i] = self.idRows[i], -1
+        start, venue_id = self.starts[row], self.venueIds[row]
+        venue = self.venues.get(venue_id)
+        self.all.remove(start, row)
+        if venue and city_key(venue[1], venue[2]) in self.cities:
+            self.cities[city_key(venue[1], venue[2])].remove(start, row)
+        if venue_id in self.venueTimelines:
+            self.venueTimelines[venue_id].remove(start, row)
+
+    def _timelines(self, venue_id):
+        venue = self.venues.get(venue_id)
+        key = city_key(venue[1], venue[2]) if venue else ('', '')
+        return (self.all, self.cities.setdefault(key, Timeline()),
+                self.venueTimelines.setdefault(venue_id, Timeline()))
+
+    def _shows(self, session, since):
+        rows = session.query(Show.id, Show.start_time, Show.venue_id, Show.artist_id,
+                             Show.duration, Show.updated_at)
+        return rows.filter(Show.updated_at >= since - CATCH_UP_OVERLAP) if since > EPOCH else rows
+
+    def _venues(self, session, since):
+        rows = session.query(Venue.id, Venue.name, Venue.city, Venue.state, Venue.updated_at)
+        return rows.filter(Venue.updated_at >= since - CATCH_UP_OVERLAP) if since > EPOCH else rows
+
+    def _artists(self, session, since):
+        rows = session.query(Artist.id, Artist.name, Artist.updated_at)
+        return rows.filter(Artist.updated_at >= since - CATCH_UP_OVERLAP) if since > EPOCH else rows
+
+    def load(self, session):
+        for id, name, city, state, updated in self._venues(session, EPOCH):
+            self.venues[id] = (name, city, state)
+            self.venuesSeen = max(self.venuesSeen, updated)
+        for id, name, updated in self._artists(session, EPOCH):
+            self.artists[id] = name
+            self.artistsSeen = max(self.artistsSeen, updated)
+        shows = self._shows(session, EPOCH).filter(Show.start_time != None, Show.venue_id != None)
+        for id, start, venue_id, artist_id, duration, updated in shows.order_by(
+                Show.start_time, Show.id).yield_per(10000):
+            self.showsSeen = max(self.showsSeen, updated)
+            seconds = to_seconds(start)
+            row = self._store(id, seconds, venue_id, artist_id or 0, duration)
+            for timeline in self._timelines(venue_id):
+                timeline.append(seconds, row)
+        # Rows went in by start time; index them by show id in one sort
+        order = sorted(range(len(self.showIds)), key=self.showIds.__getitem__)
+        self.ids = array('q', (self.showIds[row] for row in order))
+        self.idRows = array('q', order)
+        return self
+
+    def catch_up(self, session):
+        # Venues first, so new shows land in the right city
+        for id, name, city, state, updated in self._venues(session, self.venuesSeen):
+            old = self.venues.get(id)
+            self.venues[id] = (name, city, state)
+            self.venuesSeen = max(self.venuesSeen, updated)
+            if old and city_key(old[1], old[2]) != city_key(city, state) and id in self.venueTimelines:
+                # Moved city: its rows change city timelines
+                oldCity = self.cities.get(city_key(old[1], old[2]))
+                newCity = self.cities.setdefault(city_key(city, state), Timeline())
+                venueTimeline = self.venueTimelines[id]
+                for start, row in zip(venueTimeline.starts, venueTimeline.rows):
+                    if oldCity is not None:
+                        oldCity.remove(start, row)
+                    newCity.add(start, row)
+        for id, name, updated in self._artists(session, self.artistsSeen):
+            self.artists[id] = name
+            self.artistsSeen = max(self.artistsSeen, updated)
+        # New and edited shows, in any id order; one that lost its venue or start just leaves
+        for id, start, venue_id, artist_id, duration, updated in self._shows(session, self.showsSeen):
+            self.showsSeen = max(self.showsSeen, updated)
+            self._unplace(id)
+            if start is None or venue_id is None:
+                continue
+            seconds = to_seconds(start)
+            row = self._store(id, seconds, venue_id, artist_id or 0, duration)
+            self._place(id, row)
+            for timeline in self._timelines(venue_id):
+                timeline.add(seconds, row)
+
+    def drop_venue(self, venue_id):
+        venueTimeline = self.venueTimelines.pop(venue_id, None)
+        venue = self.venues.pop(venue_id, None)
+        if venueTimeline is not None:
+            cityTimeline = self.cities.get(city_key(venue[1], venue[2])) if venue else None
+            for start, row in zip(venueTimeline.starts, venueTimeline.rows):
+                self.all.remove(start, row)
+                if cityTimeline is not None:
+                    cityTimeline.remove(start, row)
+                i = self._find(self.showIds[row])
+                if i is not None:
+                    self.idRows[i] = -1
+
+    def shows_between(self, timeline, start, end, limit):
+        rows = timeline.between(to_seconds(start), to_seconds(end)) if timeline else []
+        shows = []
+        for row in rows[:limit]:
+            venue = self.venues.get(self.venueIds[row], ('', '', ''))
+            shows.append({
+                'id': self.showIds[row],
+                'start_time': from_seconds(self.starts[row]),
+                'duration': self.durations[row],
+                'venue_id': self.venueIds[row],
+                'venue_name': venue[0],
+                'artist_id': self.artistIds[row],
+                'artist_name': self.artists.get(self.artistIds[row])
+            })
+        return shows, len(rows)
+
+
+class ScheduleIndex(object):
+
+    def __init__(self, session, refresh_seconds=5, rebuild_seconds=600):
+        self.session = session
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.lock = threading.RLock()
+        self.data = None
+        self.rebuilder = None  # the background rebuild thread, while one runs
+        self.dropped = []  # venues dropped while it runs, replayed on the new data
+        self.refreshAt = self.rebuildAt = 0
+
+    def refresh(self):
+        with self.lock:
+            now = time.monotonic()
+            if now < self.refreshAt:
+                return
+            if self.data is None:
+                self.data = ScheduleData().load(self.session)
+                self.rebuildAt = time.monotonic() + self.rebuild_seconds
+            else:
+                if now >= self.rebuildAt and self.rebuilder is None:
+                    self._start_rebuild()
+                self.data.catch_up(self.session)
+            self.refreshAt = time.monotonic() + self.refresh_seconds
+
+    def _start_rebuild(self):
+        # The thread gets its own app context, and so its own session and connection
+        self.dropped = []
+        self.rebuilder = threading.Thread(target=self._rebuild, args=(_app_ctx_stack.top.app,),
+                                          name='schedule-rebuild', daemon=True)
+        self.rebuilder.start()
+
+    def _rebuild(self, app):
+        data = None
+        try:
+            with app.app_context():
+                data = ScheduleData().load(self.session)
+        finally:
+            with self.lock:
+                if data is not None:
+                    for venue_id in self.dropped:
+                        data.drop_venue(venue_id)
+                    self.data = data
+                    self.refreshAt = 0  # catch up from the new data's watermarks
+                self.rebuilder = None
+                self.dropped = []
+                self.rebuildAt = time.monotonic() + self.rebuild_seconds
+
+    def invalidate(self):
+        # Called after a write in this process; the next read catches up first
+        self.refreshAt = 0
+
+    def drop_venue(self, venue_id):
+        # Bulk deletes fire no ORM events, so delete_venue tells the index directly
+        with self.lock:
+            if self.data is None:
+                return
+            self.data.drop_venue(venue_id)
+            if self.rebuilder is not None:
+                self.dropped.append(venue_id)
+
+    def city(self, city, state, start, end, limit):
+        # Returns (shows starting in [start, end) in the city, total count before the limit)
+        self.refresh()
+        with self.lock:
+            return self.data.shows_between(self.data.cities.get(city_key(city, state)), start, end, limit)
+
+    def venue(self, venue_id, start, end, limit):
+        self.refresh()
+        with self.lock:
+            if venue_id not in self.data.venues:
+                return None
+            return self.data.shows_between(self.data.venueTimelines.get(venue_id), start, end, limit)
+
+    def stats(self):
+        with self.lock:
+            if self.data is None:
+                return {'built': False}
+            return {
+                'built': True,
+                'rebuilding': self.rebuilder is not None,
+                'shows': len(self.data.all.rows),
+                'cities': len(self.data.cities),
+                'venues': len(self.data.venueTimelines)
+            }
@@ -0,0 +1,158 @@
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+
+#----------------------------------------------------------------------------#
+# Name search backends.
+#
+# Both backends share one interface: search(term, limit) returns a list of
+# SearchResult(id, name) rows, best match first. Postgres uses the pg_trgm GIN index for
+# the ILIKE filter and similarity() for ranking; anything else gets an
+# in-process trigram index kept up to date by mapper events.
+#
+# Mapper events are global to the model class, so track_changes() registers
+# one set of listeners per model and hands each change to the in-process
+# indexes of the app it happened in.
+#----------------------------------------------------------------------------#
+
+
+SearchResult = namedtuple('SearchResult', ['id', 'name'])
+
+
+def _tracked(mapper):
+    if not has_app_context():
+        return []
+    return [index for index in current_app.extensions.get('tracked_indexes', [])
+            if index.model is mapper.class_]
+
+
+def _row_changed(mapper, connection, target):
+    for index in _tracked(mapper):
+        index.changed(target)
+
+
+def _row_deleted(mapper, connection, target):
+    for index in _tracked(mapper):
+        index.remove(target.id)
+
+
+def track_changes(app, *indexes):
+    # Only the in-process backends need telling; the database indexes itself
+    tracked = app.extensions.setdefault('tracked_indexes', [])
+    for index in indexes:
+        if not hasattr(index, 'changed'):
+            continue
+        tracked.append(index)
+        if not event.contains(index.model, 'after_delete', _row_deleted):
+            event.listen(index.model, 'after_insert', _row_changed)
+            event.listen(index.model, 'after_update', _row_changed)
+            event.listen(index.model, 'after_delete', _row_deleted)
+
+
+def trigrams(text):
+    # Same padding as pg_trgm: two leading spaces and one trailing per word
+    grams = set()
+    for word in text.lower().split():
+        padded = '  ' + word + ' '
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def like_pattern(term):
+    # Escapes LIKE wildcards so a search for "100%" matches literally
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+class PostgresSearch(object):
+
+    def __init__(self, session, model, column):
+        self.session = session
+        self.model = model
+        self.column = column
+
+    def search(self, term, limit):
+        query = self.session.query(self.model.id, self.column).filter(
+            self.column.ilike(like_pattern(term), escape='\\'))
+        if term:
+            query = query.order_by(
+                func.similarity(self.column, term).desc(), self.column)
+        else:
+            query = query.order_by(self.column)
+        return [SearchResult(id, name) for id, name in query.limit(limit)]
+
+
+class LocalSearch(object):
+
+    def __init__(self, session, model, column):
+        self.session = session
+        self.model = model
+        self.column = column
+        self.names = None  # id -> lowercased name, built on first search
+        self.postings = {}  # trigram -> set of ids
+
+    def _build(self):
+        self.names = {}
+        self.postings = {}
+        for id, name in self.session.query(self.model.id, self.column):
+            self.add(id, name)
+
+    def add(self, id, name):
+        if self.names is None:
+            return
+        self.remove(id)
+        name = (name or '').lower()
+        self.names[id] = name
+        for gram in trigrams(name):
+            self.postings.setdefault(gram, set()).add(id)
+
+    def remove(self, id):
+        if self.names is None or id not in self.names:
+            return
+        for gram in trigrams(self.names.pop(id)):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del self.postings[gram]
+
+    def changed(self, target):
+        self.add(target.id, getattr(target, self.column.key))
+
+    def search(self, term, limit):
+        if self.names is None:
+            self._build()
+        needle = term.lower()
+        termGrams = trigrams(needle)
+        # Only grams fully inside the term are guaranteed to appear in a
+        # matching name, so intersect their postings to get candidates
+        inner = [g for g in termGrams if ' ' not in g]
+        if inner:
+            candidates = set.intersection(
+                *[self.postings.get(g, set()) for g in inner])
+        else:
+            candidates = self.names.keys()
+        ranked = []
+        for id in candidates:
+            name = self.names[id]
+            if needle in name:
+                grams = trigrams(name)
+                union = len(grams | termGrams) or 1
+                ranked.append((-len(grams & termGrams) / union, name, id))
+        ranked.sort()
+        ids = [id for _, _, id in ranked[:limit]]
+        if not ids:
+            return []
+        # One lookup by primary key drops rows deleted behind the index's back
+        # (bulk Query.delete() doesn't fire mapper events)
+        rows = dict(self.session.query(self.model.id, self.column).filter(
+            self.model.id.in_(ids)))
+        return [SearchResult(id, rows[id]) for id in ids if id in rows]
+
+
+def make_search(db, model, column, uri):
+    # Picks the backend from the database URI so no connection is needed at import time
+    if uri.startswith('postgres'):
+        return PostgresSearch(db.session, model, column)
+    return LocalSearch(db.session, model, column)
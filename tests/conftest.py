@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+import pytest
+from sqlalchemy.types import Text, TypeDecorator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Artist, Venue  # noqa: E402
+
+
+class TestConfig(object):
+    # Postgres when TEST_DATABASE_URL is set, otherwise an in-memory SQLite database
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    JINJA_CACHE_DIR = None
+    WARM_UP_ON_START = False
+
+
+class JSONList(TypeDecorator):
+    # SQLite has no ARRAY type; the genres lists are stored as JSON text there
+    impl = Text
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else json.dumps(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else json.loads(value)
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            for model in (Venue, Artist):
+                model.__table__.c.genres.type = JSONList()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
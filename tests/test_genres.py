@@ -0,0 +1,35 @@
+from extensions import db
+from models import Artist
+
+BROAD = 1500  # more ids than SQLite accepts as bound parameters by default (999)
+
+
+def add_artists(count):
+    db.session.execute(Artist.__table__.insert(), [
+        {'name': 'Artist %04d' % i, 'genres': ['Jazz'] if i % 3 else ['Jazz', 'Funk']}
+        for i in range(count)])
+    db.session.commit()
+
+
+def test_broad_genre_filter_pages_through_every_match(app, client):
+    add_artists(BROAD)
+    seen, after = [], ''
+    while True:
+        response = client.get('/api/v1/artists?genre=Jazz&fields=name' + after)
+        assert response.status_code == 200
+        body = response.get_json()
+        seen += [row['id'] for row in body['data']]
+        if body['next'] is None:
+            break
+        after = '&after=' + body['next']
+    assert len(seen) == len(set(seen)) == BROAD
+
+
+def test_genre_filter_narrows_to_rows_with_every_genre(app, client):
+    add_artists(30)
+    page = client.get('/artists?genre=Jazz&genre=Funk')
+    assert page.status_code == 200
+    assert page.get_data(as_text=True).count('/artists/') >= 1
+    body = client.get('/api/v1/artists?genre=Funk&genre=Jazz').get_json()
+    assert all(row['genres'] == ['Jazz', 'Funk'] for row in body['data'])
+    assert client.get('/api/v1/artists?genre=Polka').get_json()['data'] == []
@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Artist, Show, Venue
+from queries import keyset_page, venue_areas
+
+VENUE_KEY = [Venue.state, Venue.city, Venue.name, Venue.id]
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def walk(query, columns, key, per_page=1):
+    # Follows next cursors to the end, then prev cursors back to the start
+    forward, after = [], None
+    while True:
+        page = keyset_page(query, columns, key, after=after, per_page=per_page)
+        forward += [r.id for r in page['items']]
+        if page['next'] is None:
+            break
+        after = page['next']
+    backward, before = [r.id for r in page['items']], page['prev']
+    while before:
+        page = keyset_page(query, columns, key, before=before, per_page=per_page)
+        backward = [r.id for r in page['items']] + backward
+        before = page['prev']
+    return forward, backward
+
+
+def test_venue_pager_reaches_rows_with_null_sort_columns(app):
+    for i in range(9):
+        db.session.add(Venue(name=None if i == 4 else 'Venue %d' % i,
+                             city=None if i == 2 else 'San Francisco',
+                             state=None if i == 7 else 'CA'))
+    db.session.commit()
+    with app.test_request_context():
+        forward, backward = walk(venue_areas(), VENUE_KEY, lambda v: (v.state, v.city, v.name, v.id))
+    assert sorted(forward) == sorted(v.id for v in Venue.query)
+    assert backward == forward
+
+
+def test_artist_pager_reaches_rows_with_null_names(app):
+    for i in range(5):
+        db.session.add(Artist(name=None if i % 2 else 'Artist %d' % i))
+    db.session.commit()
+    with app.test_request_context():
+        forward, backward = walk(db.session.query(Artist.id, Artist.name), [Artist.name, Artist.id],
+                                 lambda a: (a.name, a.id), per_page=2)
+    assert len(forward) == 5 and backward == forward
+
+
+def test_shows_pager_skips_unscheduled_shows(app, client):
+    venue, artist = Venue(name='Venue'), Artist(name='Artist')
+    start = datetime.now() + timedelta(days=1)
+    db.session.add_all([Show(venues=venue, artist=artist, start_time=start),
+                        Show(venues=venue, artist=artist, start_time=None)])
+    db.session.commit()
+    response = client.get('/api/v1/shows')
+    assert response.status_code == 200
+    assert len(response.get_json()['data']) == 1
+
+
+@pytest.mark.parametrize('path, values', [
+    ('/venues', ['CA', None, 'Venue', 1]),
+    ('/venues', ['CA', 'San Francisco', 'Venue', '1']),
+    ('/venues', ['CA', 'San Francisco', 'Venue']),
+    ('/artists', ['Artist', True]),
+    ('/artists', [1, 1]),
+    ('/shows', ['not a date', 1]),
+    ('/shows', [None, 1]),
+    ('/api/v1/venues', [['Venue'], 1]),
+])
+@pytest.mark.parametrize('direction', ['after', 'before'])
+def test_malformed_cursors_are_rejected(client, path, values, direction):
+    assert client.get('%s?%s=%s' % (path, direction, cursor(values))).status_code == 400
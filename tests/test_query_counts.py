@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from extensions import db
+from models import Artist, Show, Venue
+
+MANY = 12
+
+
+def count_statements(client, path):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def add_venue_with_shows(shows):
+    # One venue, with shows split between the past and the future, each by its own artist
+    venue = Venue(name='Venue', city='San Francisco', state='CA', genres=['Jazz'])
+    db.session.add(venue)
+    now = datetime.now()
+    for i in range(shows):
+        artist = Artist(name='Artist %d' % i, city='San Francisco', state='CA', genres=['Jazz'])
+        start = now + timedelta(days=i + 1) * (1 if i % 2 else -1)
+        db.session.add(Show(venues=venue, artist=artist, start_time=start))
+    db.session.commit()
+    return venue.id
+
+
+def add_artist_with_shows(shows):
+    artist = Artist(name='Artist', city='San Francisco', state='CA', genres=['Jazz'])
+    db.session.add(artist)
+    now = datetime.now()
+    for i in range(shows):
+        venue = Venue(name='Venue %d' % i, city='San Francisco', state='CA', genres=['Jazz'])
+        start = now + timedelta(days=i + 1) * (1 if i % 2 else -1)
+        db.session.add(Show(venues=venue, artist=artist, start_time=start))
+    db.session.commit()
+    return artist.id
+
+
+@pytest.mark.parametrize('path, add', [
+    ('/venues/%d', add_venue_with_shows),
+    ('/artists/%d', add_artist_with_shows),
+])
+def test_detail_page_statements_do_not_grow_with_shows(client, path, add):
+    one = add(1)
+    many = add(MANY)
+    db.session.remove()
+    assert count_statements(client, path % one) == count_statements(client, path % many)
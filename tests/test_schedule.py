@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Artist, Show, Venue
+
+START = datetime(2030, 1, 1, 20)
+END = START + timedelta(days=30)
+
+
+@pytest.fixture
+def schedule(app):
+    index = app.extensions['schedule']
+    index.refresh_seconds = 3600  # only invalidate() or the tests trigger a catch-up
+    return index
+
+
+def add_show(venue, artist, start):
+    show = Show(venues=venue, artist=artist, start_time=start)
+    db.session.add(show)
+    db.session.commit()
+    return show.id
+
+
+def city_ids(schedule, city, state):
+    schedule.invalidate()
+    return [s['id'] for s in schedule.city(city, state, START, END, 100)[0]]
+
+
+def test_catch_up_adds_moves_and_removes_shows(app, schedule):
+    venue, artist = Venue(name='Hall', city='San Francisco', state='CA'), Artist(name='Band')
+    first = add_show(venue, artist, START + timedelta(days=2))
+    assert city_ids(schedule, 'San Francisco', 'CA') == [first]
+
+    second = add_show(venue, artist, START + timedelta(days=1))
+    assert city_ids(schedule, 'San Francisco', 'CA') == [second, first]
+
+    Show.query.get(second).start_time = START + timedelta(days=3)
+    db.session.commit()
+    assert city_ids(schedule, 'San Francisco', 'CA') == [first, second]
+
+    Show.query.get(first).start_time = None
+    db.session.commit()
+    assert city_ids(schedule, 'San Francisco', 'CA') == [second]
+
+
+def test_venue_moving_city_takes_its_shows(app, schedule):
+    venue, artist = Venue(name='Hall', city='San Francisco', state='CA'), Artist(name='Band')
+    show = add_show(venue, artist, START)
+    assert city_ids(schedule, 'San Francisco', 'CA') == [show]
+
+    venue.city, venue.state = 'Brooklyn', 'NY'
+    db.session.commit()
+    assert city_ids(schedule, 'San Francisco', 'CA') == []
+    assert city_ids(schedule, 'brooklyn', 'ny') == [show]
+
+
+def test_drop_venue_removes_its_shows(app, client, schedule):
+    kept, dropped = Venue(name='Kept', city='Austin', state='TX'), Venue(name='Gone', city='Austin', state='TX')
+    artist = Artist(name='Band')
+    show = add_show(kept, artist, START)
+    add_show(dropped, artist, START + timedelta(days=1))
+    droppedId = dropped.id
+    assert len(city_ids(schedule, 'Austin', 'TX')) == 2
+
+    assert client.delete('/venues/%d' % droppedId).get_json() == {'success': True}
+    assert city_ids(schedule, 'Austin', 'TX') == [show]
+    assert schedule.venue(droppedId, START, END, 100) is None
+
+
+def test_rebuild_runs_off_the_request_and_swaps_in(app, client, schedule):
+    kept, dropped = Venue(name='Kept', city='Austin', state='TX'), Venue(name='Gone', city='Austin', state='TX')
+    artist = Artist(name='Band')
+    show = add_show(kept, artist, START)
+    add_show(dropped, artist, START + timedelta(days=1))
+    droppedId = dropped.id
+    assert len(city_ids(schedule, 'Austin', 'TX')) == 2
+    old = schedule.data
+
+    schedule.rebuildAt = 0
+    schedule.invalidate()
+    schedule.refresh()  # starts the rebuild and serves from the current data meanwhile
+    assert client.delete('/venues/%d' % droppedId).get_json() == {'success': True}
+    if schedule.rebuilder is not None:
+        schedule.rebuilder.join()
+    assert schedule.data is not old
+    assert city_ids(schedule, 'Austin', 'TX') == [show]
@@ -0,0 +1,257 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from sqlalchemy.orm import joinedload
+from werkzeug.exceptions import HTTPException
+
+from extensions import artistGenres, db, schedule, venueGenres
+from genres import selected_genres
+from models import Artist, Show, Venue
+from queries import keyset_page, past_shows_query, upcoming_shows_query
+
+#----------------------------------------------------------------------------#
+# JSON API.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+API_VENUE_FIELDS = ['id', 'name', 'city', 'state', 'address', 'phone', 'genres', 'image_link',
+                    'facebook_link', 'seeking_talent', 'seeking_description',
+                    'upcoming_shows_count', 'past_shows_count']
+API_ARTIST_FIELDS = ['id', 'name', 'city', 'state', 'phone', 'genres', 'image_link',
+                     'facebook_link', 'seeking_venue', 'seeking_description',
+                     'upcoming_shows_count', 'past_shows_count']
+API_SHOW_FIELDS = ['id', 'venue_id', 'artist_id', 'start_time', 'duration']
+
+
+def api_list_arg(name, allowed):
+    # Parses ?fields= / ?include= into a list, rejecting names the resource doesn't have
+    value = request.args.get(name)
+    if not value:
+        return None
+    names = [n.strip() for n in value.split(',') if n.strip()]
+    unknown = set(names) - set(allowed)
+    if unknown:
+        abort(400, 'Unknown %s: %s' % (name, ', '.join(sorted(unknown))))
+    return names
+
+
+def api_fields(allowed):
+    fields = api_list_arg('fields', allowed) or allowed
+    return fields if 'id' in fields else ['id'] + fields
+
+
+def api_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def api_row(obj, fields):
+    return dict((f, api_value(getattr(obj, f))) for f in fields)
+
+
+def api_versions(obj):
+    # Counters change through bulk UPDATEs that don't bump the row version
+    return (obj.id, obj.version, getattr(obj, 'upcoming_shows_count', None),
+            getattr(obj, 'past_shows_count', None))
+
+
+def api_response(versions, build):
+    # Strong ETag over the row versions behind the response; a match skips serialization
+    etag = hashlib.sha1(repr((request.full_path, versions)).encode('utf-8')).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    return response
+
+
+def api_calendar_range():
+    # ?from= and ?to= as ISO dates or datetimes; a week from the start of today by default
+    try:
+        start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else \
+            datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = datetime.fromisoformat(request.args['to']) if request.args.get('to') else \
+            start + timedelta(days=7)
+        limit = min(int(request.args.get('limit') or current_app.config['CALENDAR_LIMIT']),
+                    current_app.config['CALENDAR_LIMIT'])
+    except ValueError as e:
+        abort(400, str(e))
+    if start.tzinfo is not None or end.tzinfo is not None:
+        # Show times are stored without a zone, so an offset can't be compared with them
+        abort(400, 'from and to must not carry a UTC offset')
+    if end <= start or limit < 1:
+        abort(400, 'Empty calendar range')
+    return start, end, limit
+
+
+def api_calendar_versions(shows, total):
+    # Every value the response carries, so any worker's index yields the same ETag for the same data
+    return (total, [(s['id'], s['start_time'], s['duration'], s['venue_id'], s['venue_name'],
+                     s['artist_id'], s['artist_name']) for s in shows])
+
+
+def api_calendar(shows, total, start, end):
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'total': total,
+        'data': [{'id': s['id'], 'start_time': s['start_time'].isoformat(), 'duration': s['duration'],
+                  'venue': {'id': s['venue_id'], 'name': s['venue_name']},
+                  'artist': {'id': s['artist_id'], 'name': s['artist_name']}} for s in shows]
+    }
+
+
+def api_show(show, includes):
+    data = api_row(show, API_SHOW_FIELDS)
+    if 'venue' in includes:
+        data['venue'] = api_row(show.venues, ['id', 'name', 'image_link'])
+    if 'artist' in includes:
+        data['artist'] = api_row(show.artist, ['id', 'name', 'image_link'])
+    return data
+
+
+def api_show_versions(row):
+    return (row.id, row.version, row.venue_id, row.venue_version,
+            row.artist_id, row.artist_version)
+
+
+def api_version_query(model):
+    # Only the columns api_versions and the pager read, so a 304 never loads whole rows
+    return db.session.query(model.id, model.name, model.version,
+                            model.upcoming_shows_count, model.past_shows_count)
+
+
+def api_show_version_query():
+    return db.session.query(
+        Show.id, Show.start_time, Show.version,
+        Venue.id.label('venue_id'), Venue.version.label('venue_version'),
+        Artist.id.label('artist_id'), Artist.version.label('artist_version')
+    ).outerjoin(Venue, Show.venue_id == Venue.id).outerjoin(Artist, Show.artist_id == Artist.id)
+
+
+def api_load(query, model, ids):
+    # Full rows for the ids a version query picked, in its order
+    if not ids:
+        return []
+    rows = dict((r.id, r) for r in query.filter(model.id.in_(ids)))
+    return [rows[id] for id in ids if id in rows]
+
+
+def api_list(model, fields, genres):
+    # ?genre= may repeat; rows must carry every one
+    query = genres.filter(api_version_query(model), selected_genres(request.args.getlist('genre')))
+    page = keyset_page(query, [model.name, model.id], lambda r: (r.name, r.id),
+                       after=request.args.get('after'), before=request.args.get('before'))
+    ids = [r.id for r in page['items']]
+    return api_response([api_versions(r) for r in page['items']], lambda: {
+        'data': [api_row(r, fields) for r in api_load(db.session.query(model), model, ids)],
+        'next': page['next'],
+        'prev': page['prev']
+    })
+
+
+def api_detail(model, entity_id, fields, column, related):
+    # include=upcoming_shows,past_shows expands the shows the detail page lists
+    includes = api_list_arg('include', ['upcoming_shows', 'past_shows']) or []
+    version = api_version_query(model).filter(model.id == entity_id).first()
+    if version is None:
+        abort(404)
+    shows = {}
+    if 'upcoming_shows' in includes:
+        shows['upcoming_shows'] = upcoming_shows_query(column, entity_id, api_show_version_query()).all()
+    if 'past_shows' in includes:
+        shows['past_shows'] = past_shows_query(column, entity_id, api_show_version_query()).all()
+    other = 'artist' if related is Show.artist else 'venue'
+    versions = [api_versions(version)] + [[api_show_versions(s) for s in shows[k]] for k in includes]
+
+    def build():
+        entity = db.session.query(model).get(entity_id)
+        if entity is None:
+            abort(404)
+        data = api_row(entity, fields)
+        for key in includes:
+            rows = api_load(db.session.query(Show).options(joinedload(related)), Show,
+                            [s.id for s in shows[key]])
+            data[key] = [api_show(s, [other]) for s in rows]
+        return data
+    return api_response(versions, build)
+
+
+@ bp.route('/venues')
+def api_venues():
+    return api_list(Venue, api_fields(API_VENUE_FIELDS), venueGenres)
+
+
+@ bp.route('/venues/<int:venue_id>')
+def api_venue(venue_id):
+    return api_detail(Venue, venue_id, api_fields(API_VENUE_FIELDS), Show.venue_id, Show.artist)
+
+
+@ bp.route('/artists')
+def api_artists():
+    return api_list(Artist, api_fields(API_ARTIST_FIELDS), artistGenres)
+
+
+@ bp.route('/artists/<int:artist_id>')
+def api_artist(artist_id):
+    return api_detail(Artist, artist_id, api_fields(API_ARTIST_FIELDS), Show.artist_id, Show.venues)
+
+
+@ bp.route('/shows')
+def api_shows():
+    # Same ordering and joins as /shows; include=venue,artist nests their names and images
+    includes = api_list_arg('include', ['venue', 'artist']) or []
+    query = db.session.query(Show).options(
+        joinedload(Show.artist), joinedload(Show.venues))
+    versions = api_show_version_query().filter(Show.start_time != None)
+    page = keyset_page(versions, [Show.start_time, Show.id], lambda s: (s.start_time, s.id),
+                       after=request.args.get('after'), before=request.args.get('before'))
+    ids = [s.id for s in page['items']]
+    return api_response([api_show_versions(s) for s in page['items']], lambda: {
+        'data': [api_show(s, includes) for s in api_load(query, Show, ids)],
+        'next': page['next'],
+        'prev': page['prev']
+    })
+
+
+@ bp.route('/genres')
+def api_genres():
+    # Per-genre venue and artist counts, narrowed to rows that carry every ?genre=
+    genres = selected_genres(request.args.getlist('genre'))
+    return jsonify(dict((name, [{'genre': g, 'count': n} for g, n in backend.facets(genres)])
+                        for name, backend in (('venues', venueGenres), ('artists', artistGenres))))
+
+
+@ bp.route('/calendar')
+def api_city_calendar():
+    # Served from the in-memory schedule; the database is only read when it refreshes
+    city, state = request.args.get('city'), request.args.get('state')
+    if not city or not state:
+        abort(400, 'city and state are required')
+    start, end, limit = api_calendar_range()
+    shows, total = schedule.city(city, state, start, end, limit)
+    return api_response(api_calendar_versions(shows, total),
+                        lambda: api_calendar(shows, total, start, end))
+
+
+@ bp.route('/venues/<int:venue_id>/calendar')
+def api_venue_calendar(venue_id):
+    start, end, limit = api_calendar_range()
+    found = schedule.venue(venue_id, start, end, limit)
+    if found is None:
+        abort(404)
+    shows, total = found
+    return api_response(api_calendar_versions(shows, total),
+                        lambda: api_calendar(shows, total, start, end))
+
+
+@ bp.errorhandler(404)
+@ bp.errorhandler(500)
+@ bp.errorhandler(HTTPException)
+def api_error(error):
+    # abort() under /api/v1 answers in JSON, not with the site's HTML error pages; 404 and
+    # 500 are named too, since the app's handlers for those codes would otherwise win
+    headers = [h for h in error.get_headers() if h[0] != 'Content-Type']  # e.g. Allow on a 405
+    return jsonify({'error': error.description}), error.code, headers
@@ -0,0 +1,194 @@
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, url_for
+
+from extensions import artistGenres, artistSearch, db, fanout, pageCache, schedule
+from genres import selected_genres
+from httpcache import conditional, validator_digest
+from models import Artist, Show
+from queries import (artist_cache_keys, artist_last_modified, keyset_page, listing_last_modified,
+                     past_shows, show_counts, upcoming_counters, upcoming_shows)
+
+#----------------------------------------------------------------------------#
+# Artists.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('artists', __name__)
+
+
+@ bp.route('/artists')  # DONE
+@ conditional(lambda: listing_last_modified(Artist))
+def artists():
+    genres = selected_genres(request.args.getlist('genre'))  # every one must match
+    page = keyset_page(artistGenres.filter(db.session.query(Artist.id, Artist.name), genres),
+                       [Artist.name, Artist.id],
+                       lambda a: (a.name, a.id),
+                       after=request.args.get('after'), before=request.args.get('before'))
+
+    data = []
+
+    for artist in page['items']:
+        data.append({
+            'id': artist.id,
+            'name': artist.name
+        })
+
+    return render_template('pages/artists.html', artists=data, page=page,
+                           genres=genres, facets=artistGenres.facets(genres))
+
+
+@ bp.route('/artists/search', methods=['GET', 'POST'])  # Done
+def search_artists():
+    # TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+    # search for "band" should return "The Wild Sax Band".
+
+    searchTerm = request.values.get('search_term', '')  # Gets search term
+    # Searches for names which contain the term from the input box, best match first
+    results = artistSearch.search(searchTerm, current_app.config['SEARCH_LIMIT'])
+    # Facet links come back here as GETs with the term and ?genre=, narrowing these matches
+    genres = selected_genres(request.values.getlist('genre'))
+    facets = artistGenres.facets(genres, ids=[r.id for r in results])
+    kept = set(artistGenres.keep([r.id for r in results], genres))
+    results = [r for r in results if r.id in kept]
+    artists = []
+
+    counts = upcoming_counters(Artist, [r.id for r in results])
+    for result in results:
+        artists.append({
+            'id': result.id,
+            'name': result.name,
+            'num_upcoming_shows': counts.get(result.id, 0)
+        })
+
+    response = {
+        "count": len(results),
+        "data": artists
+    }
+    return render_template('pages/search_artists.html', results=response, search_term=searchTerm,
+                           genres=genres, facets=facets)
+
+
+def artist_page_data(artist_id):
+    # Assembles everything the artist page shows; cached by show_artist
+    def showData(show):
+        return {
+            'venue_id': show.venue_id,
+            'venue_name': show.venues.name,
+            'venue_image_link': show.venues.image_link,
+            'start_time': str(show.start_time)
+        }
+
+    artist, upcomingShows, pastShows, (pastCount, upcomingCount) = fanout.gather(
+        lambda: db.session.query(Artist).get(artist_id),
+        lambda: [showData(show) for show in upcoming_shows(Show.artist_id, artist_id, Show.venues)],
+        lambda: [showData(show) for show in past_shows(Show.artist_id, artist_id, Show.venues)],
+        lambda: show_counts(Show.artist_id, artist_id))
+    if artist is None:
+        abort(404)
+
+    return {
+        "id": artist.id,
+        "name": artist.name,
+        "genres": artist.genres,
+        "city": artist.city,
+        "state": artist.state,
+        "phone": artist.phone,
+        "seeking_venue": artist.seeking_venue,
+        "seeking_description": artist.seeking_description,
+        "image_link": artist.image_link,
+        'past_shows': pastShows,
+        'upcoming_shows': upcomingShows,
+        'past_shows_count': pastCount,
+        'upcoming_shows_count': upcomingCount
+    }
+
+
+@ bp.route('/artists/<int:artist_id>')  # DONE
+@ conditional(artist_last_modified)
+def show_artist(artist_id):
+    # shows the artist page with the given artist_id
+    artistData = pageCache.get_or_build(
+        'artist:%s' % artist_id, lambda: artist_page_data(artist_id), validator_digest())
+    return render_template('pages/show_artist.html', artist=artistData)
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@ bp.route('/artists/<int:artist_id>/edit', methods=['GET'])  # DONE
+def edit_artist(artist_id):
+    # One row load; the form copies its fields straight from the model
+    artist = db.session.query(Artist).get(artist_id)
+    if artist is None:
+        abort(404)
+    from forms import ArtistForm
+    form = ArtistForm(obj=artist)
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+
+@ bp.route('/artists/<int:artist_id>/edit', methods=['POST'])  # DONE
+def edit_artist_submission(artist_id):
+    # TODO: take values from the form submitted, and update existing
+    # artist record with ID <artist_id> using the new attributes
+    name = request.form['name']
+    city = request.form['city']
+    state = request.form['state']
+    phone = request.form['phone']
+    genres = request.form.getlist('genres')
+    facebook_link = request.form['facebook_link']
+    image_link = request.form['image_link']
+
+    try:
+        Artist1 = db.session.query(Artist).get(artist_id)
+        Artist1.name = name
+        Artist1.city = city
+        Artist1.state = state
+        Artist1.phone = phone
+        Artist1.genres = genres
+        Artist1.facebook_link = facebook_link
+        Artist1.image_link = image_link
+        db.session.commit()
+        pageCache.invalidate(*artist_cache_keys(artist_id))
+        schedule.invalidate()
+        flash("Artist successfully edited!")
+    except:
+        flash("Artist unsuccessfully edited.")
+    return redirect(url_for('.show_artist', artist_id=artist_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@ bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    from forms import ArtistForm
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@ bp.route('/artists/create', methods=['POST'])  # DONE
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    # TODO: insert form data as a new Venue record in the db, instead
+    # TODO: modify data to be the data object returned from db insertion
+
+    # on successful db insert, flash success
+    name = request.form['name']
+    city = request.form['city']
+    state = request.form['state']
+    phone = request.form['phone']
+    genres = request.form.getlist('genres')
+    image_link = request.form['image_link']
+    facebook_link = request.form['facebook_link']
+    try:
+        db.session.add(Artist(name=name, city=city, state=state, phone=phone,
+                              genres=genres, image_link=image_link, facebook_link=facebook_link, seeking_venue=False, seeking_description="Good God, please hire me!"))
+        db.session.commit()
+        schedule.invalidate()
+        flash('Artist ' + request.form['name'] + ' was successfully listed!')
+    except:
+        flash('Artist ' + request.form['name'] + ' was unsuccessfully listed.')
+        db.session.rollback()
+
+    # TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Artist ' + data.name + ' could not be listed.')
+    return render_template('pages/home.html')
@@ -0,0 +1,95 @@
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, stream_with_context
+
+from dbpool import pool_stats
+from extensions import db, pageCache
+from models import Artist, Show, Venue
+from views import api
+
+#----------------------------------------------------------------------------#
+# Home, export, stats and error pages.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('main', __name__)
+
+
+@ bp.route('/')
+def index():
+    return render_template('pages/home.html')
+
+
+#  Export
+#  ----------------------------------------------------------------
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def export_query(kind):
+    if kind == 'shows':
+        # Same joined fields as the /shows page
+        return db.session.query(
+            Show.id, Show.start_time, Show.duration, Show.venue_id, Venue.name.label('venue_name'),
+            Show.artist_id, Artist.name.label('artist_name'),
+            Artist.image_link.label('artist_image_link')
+        ).join(Venue, Venue.id == Show.venue_id).join(
+            Artist, Artist.id == Show.artist_id).order_by(Show.id)
+    model = {'venues': Venue, 'artists': Artist}[kind]
+    return db.session.query(*model.__table__.columns).order_by(model.id)
+
+
+@ bp.route('/export/<any(shows, venues, artists):kind>.<any(csv, ndjson):format>')
+def export(kind, format):
+    # Streams the whole table with a server-side cursor, a batch of rows at a time
+    import exporter
+    query = export_query(kind)
+    columns = [c['name'] for c in query.column_descriptions]
+    rows = query.execution_options(stream_results=True).yield_per(1000)
+    chunks = getattr(exporter, '%s_chunks' % format)(columns, rows)
+    headers = {'Content-Disposition': 'attachment; filename=%s.%s' % (kind, format)}
+    if 'gzip' in request.accept_encodings:
+        chunks = exporter.gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(stream_with_context(chunks), mimetype=EXPORT_MIMETYPES[format], headers=headers)
+
+
+#  Stats
+#  ----------------------------------------------------------------
+
+@ bp.route('/cache/stats')
+def cache_stats():
+    # Hit/miss counters for this worker's page cache
+    return jsonify(pageCache.stats())
+
+
+@ bp.route('/pool/stats')
+def pool_status():
+    # Connection pool usage for this worker, next to the configured limits
+    stats = pool_stats(db.engine.pool)
+    stats['config'] = dict((k, v) for k, v in current_app.config['SQLALCHEMY_ENGINE_OPTIONS'].items()
+                           if k != 'poolclass')
+    return jsonify(stats)
+
+
+def is_api_request():
+    # URLs that match no route never reach the API blueprint's own error handlers
+    return request.path.startswith(api.bp.url_prefix + '/')
+
+
+@ bp.app_errorhandler(404)
+def not_found_error(error):
+    if is_api_request():
+        return api.api_error(error)
+    return render_template('errors/404.html'), 404
+
+
+@ bp.app_errorhandler(405)
+def method_not_allowed_error(error):
+    return api.api_error(error) if is_api_request() else error
+
+
+@ bp.app_errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500
@@ -0,0 +1,116 @@
+from flask import Blueprint, current_app, flash, render_template, request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from extensions import db, pageCache, schedule
+from httpcache import conditional
+from models import Artist, Show, Venue
+from queries import count_show, keyset_page, listing_last_modified, schedule_conflicts
+
+#----------------------------------------------------------------------------#
+# Shows.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('shows', __name__)
+
+
+@ bp.route('/shows')  # Done
+@ conditional(lambda: listing_last_modified(Show, Artist, Venue))
+def shows():
+
+    # displays list of shows at /shows, a page at a time ordered by start time
+    # A show without a start time has no place in start order (nor on the detail pages)
+    query = db.session.query(Show).options(
+        joinedload(Show.artist), joinedload(Show.venues)).filter(Show.start_time != None)
+    page = keyset_page(query, [Show.start_time, Show.id], lambda s: (s.start_time, s.id),
+                       after=request.args.get('after'), before=request.args.get('before'))
+
+    showsAndData = []
+
+    for show in page['items']:  # Cycles through the shows on this page
+        showsAndData.append({
+            'venue_id': show.venue_id,
+            'venue_name': show.venues.name,
+            'artist_id': show.artist_id,
+            'artist_name': show.artist.name,
+            'artist_image_link': show.artist.image_link,
+            'start_time': show.start_time
+        })
+
+    return render_template('pages/shows.html', shows=showsAndData, page=page)
+
+
+@ bp.route('/shows/create')
+def create_shows():
+    # renders form. do not touch.
+    from forms import ShowForm
+    form = ShowForm()
+
+    return render_template('forms/new_show.html', form=form)
+
+
+# Exclusion constraints on shows (see migration e5a8f1c3b726)
+OVERLAP_CONSTRAINTS = ('shows_venue_no_overlap', 'shows_artist_no_overlap')
+
+
+def is_double_booking(error):
+    # Other integrity errors (a deleted venue or artist, a counter insert race)
+    # are not double bookings
+    diag = getattr(error.orig, 'diag', None)
+    if getattr(diag, 'constraint_name', None):
+        return diag.constraint_name in OVERLAP_CONSTRAINTS
+    return any(name in str(error.orig) for name in OVERLAP_CONSTRAINTS)
+
+
+@ bp.route('/shows/create', methods=['POST'])  # Done
+def create_show_submission():
+    # called to create new shows in the db, upon submitting new show listing form
+    # TODO: insert form data as a new Show record in the db, instead
+    import dateutil.parser
+
+    try:
+        artistID = int(request.form['artist_id'])
+        venueID = int(request.form['venue_id'])
+        startTime = dateutil.parser.parse(request.form['start_time'])
+        duration = int(request.form.get('duration') or 120)
+    except (ValueError, OverflowError):
+        flash('Error: Artist ID, Venue ID, start time and duration must be valid.')
+        return render_template('pages/home.html')
+
+    if db.session.query(Artist.id).filter_by(id=artistID).first() is None or \
+            db.session.query(Venue.id).filter_by(id=venueID).first() is None:
+        flash('Error: Either Artist or Venue don\'t exist!')
+    elif not 0 < duration <= current_app.config['SHOW_MAX_DURATION']:
+        flash('Error: A show must last between 1 and %d minutes.' % current_app.config['SHOW_MAX_DURATION'])
+    else:
+        conflicts = schedule_conflicts(venueID, artistID, startTime, duration)
+        if conflicts:
+            flash('Error: Double booking, ' + '; '.join(conflicts) + '.')
+            return render_template('pages/home.html')
+        try:
+            db.session.add(Show(venue_id=venueID, artist_id=artistID,
+                                start_time=startTime, duration=duration))
+            count_show(venueID, artistID, startTime)  # Same transaction as the insert
+            db.session.commit()
+            pageCache.invalidate('venue:%s' % venueID, 'artist:%s' % artistID)
+            schedule.invalidate()
+            flash('Show successfully added!')
+        except IntegrityError as error:
+            db.session.rollback()
+            if is_double_booking(error):
+                # Another booking won the race; the exclusion constraints caught it
+                flash('Error: Double booking, the artist or venue was just booked for that time.')
+            else:
+                flash(
+                    'Uh oh! an Error happened when connecting to the Database. Don\'t worry, not your fault!')
+        except:
+            db.session.rollback()
+            flash(
+                'Uh oh! an Error happened when connecting to the Database. Don\'t worry, not your fault!')
+
+    # on successful db insert, flash success
+
+    # TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Show could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template('pages/home.html')
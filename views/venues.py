@@ -0,0 +1,243 @@
+from flask import Blueprint, abort, current_app, flash, jsonify, redirect, render_template, request, url_for
+
+from extensions import db, fanout, pageCache, schedule, venueGenres, venueSearch
+from genres import selected_genres
+from httpcache import conditional, validator_digest
+from models import Show, Venue
+from queries import (keyset_page, listing_last_modified, mark_deleted, past_shows, show_counts,
+                     uncount_venue_shows, upcoming_counters, upcoming_shows, venue_areas,
+                     venue_cache_keys, venue_last_modified)
+
+#----------------------------------------------------------------------------#
+# Venues.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('venues', __name__)
+
+
+@ bp.route('/venues')  # DONE
+@ conditional(lambda: listing_last_modified(Venue))
+def venues():
+    genres = selected_genres(request.args.getlist('genre'))  # every one must match
+    page = keyset_page(venueGenres.filter(venue_areas(), genres), [Venue.state, Venue.city, Venue.name, Venue.id],
+                       lambda v: (v.state, v.city, v.name, v.id),
+                       after=request.args.get('after'), before=request.args.get('before'))
+
+    finalData = []
+    area = None
+    for v in page['items']:  # Rows arrive sorted by state and city, so each area is contiguous
+        if area is None or (area['state'], area['city']) != (v.state, v.city):
+            area = {
+                'city': v.city,
+                'state': v.state,
+                'venues': []
+            }
+            finalData.append(area)
+        area['venues'].append({
+            'id': v.id,
+            'name': v.name,
+            'num_upcoming_shows': v.num_upcoming_shows
+        })
+
+    return render_template('pages/venues.html', areas=finalData, page=page,
+                           genres=genres, facets=venueGenres.facets(genres))
+
+
+@ bp.route('/venues/search', methods=['GET', 'POST'])  # DONE
+def search_venues():
+
+    # TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for Hop should return "The Musical Hop".
+    # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+
+    # Fetches the Search term from the input
+    searchTerm = request.values.get('search_term', '')
+    # Fetches the venues whose name contains the search term, best match first
+    results = venueSearch.search(searchTerm, current_app.config['SEARCH_LIMIT'])
+    # Facet links come back here as GETs with the term and ?genre=, narrowing these matches
+    genres = selected_genres(request.values.getlist('genre'))
+    facets = venueGenres.facets(genres, ids=[r.id for r in results])
+    kept = set(venueGenres.keep([r.id for r in results], genres))
+    results = [r for r in results if r.id in kept]
+    venues = []
+
+    # One lookup over the matched ids instead of a count query per venue
+    counts = upcoming_counters(Venue, [r.id for r in results])
+    for result in results:
+        venues.append({
+            'id': result.id,
+            'name': result.name,
+            'num_upcoming_shows': counts.get(result.id, 0)
+        })
+
+    response = {
+        "count": len(venues),
+        "data": venues
+    }
+    return render_template('pages/search_venues.html', results=response, search_term=searchTerm,
+                           genres=genres, facets=facets)
+
+
+def venue_page_data(venue_id):
+    # Assembles everything the venue page shows; cached by show_venue
+    def showData(show):
+        return {
+            'artist_id': show.artist_id,
+            'artist_name': show.artist.name,
+            'artist_image_link': show.artist.image_link,
+            'start_time': str(show.start_time)
+        }
+
+    # The four reads are independent, so they run concurrently
+    v, upcomingShows, pastShows, (pastCount, upcomingCount) = fanout.gather(
+        lambda: db.session.query(Venue).get(venue_id),
+        lambda: [showData(show) for show in upcoming_shows(Show.venue_id, venue_id, Show.artist)],
+        lambda: [showData(show) for show in past_shows(Show.venue_id, venue_id, Show.artist)],
+        lambda: show_counts(Show.venue_id, venue_id))
+    if v is None:
+        abort(404)
+
+    venueData = {
+        'id': v.id,
+        'name': v.name,
+        'genres': v.genres,
+        'address': v.address,
+        'city': v.city,
+        'state': v.state,
+        'phone': v.phone,
+        'facebook_link': v.facebook_link,
+        'seeking_talent': v.seeking_talent,
+        'seeking_description': v.seeking_description,
+        'image_link': v.image_link,
+        'past_shows': pastShows,
+        'upcoming_shows': upcomingShows,
+        'past_shows_count': pastCount,
+        'upcoming_shows_count': upcomingCount
+    }
+
+    return venueData
+
+
+@ bp.route('/venues/<int:venue_id>')  # Done
+@ conditional(venue_last_modified)
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    venueData = pageCache.get_or_build(
+        'venue:%s' % venue_id, lambda: venue_page_data(venue_id), validator_digest())
+    return render_template('pages/show_venue.html', venue=venueData)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@ bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    from forms import VenueForm
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@ bp.route('/venues/create', methods=['POST'])  # DONE
+def create_venue_submission():
+    # TODO: insert form data as a new Venue record in the db, instead
+    # TODO: modify data to be the data object returned from db insertion
+    name = request.form['name']
+    city = request.form['city']
+    state = request.form['state']
+    address = request.form['state']
+    phone = request.form['phone']
+    image_link = request.form['image_link']
+    genres = request.form.getlist('genres')
+    facebook_link = request.form['facebook_link']
+    # on successful db insert, flash success
+
+    try:
+        db.session.add(Venue(name=name, city=city, state=state, address=address, phone=phone, image_link=image_link,
+                             genres=genres, facebook_link=facebook_link, seeking_talent=False, seeking_description="Why are we seeking talent?"))
+        db.session.commit()
+        schedule.invalidate()
+        flash('Venue ' +
+              request.form['name'] + ' has been successfully added.')
+    except:
+        flash('There was an error inserting ' +
+              request.form['name'] + ' as an artist.')
+        db.session.rollback()
+
+    # TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template('pages/home.html')
+
+
+@ bp.route('/venues/<venue_id>', methods=['DELETE'])  # DONE
+def delete_venue(venue_id):
+    try:
+        cacheKeys = venue_cache_keys(venue_id)  # Collected before the shows are gone
+        uncount_venue_shows(venue_id)  # Same transaction as the delete
+        Show.query.filter_by(venue_id=venue_id).delete()
+        Venue.query.filter_by(id=venue_id).delete()
+        mark_deleted(Venue, Show)
+        db.session.commit()
+        pageCache.invalidate(*cacheKeys)
+        schedule.drop_venue(int(venue_id))
+        venueGenres.remove(int(venue_id))
+        flash("Venue successfully deleted!")
+        success = True
+    except:
+        db.session.rollback()
+        flash("Venue unsuccessfully deleted.")
+        success = False
+    # TODO: Complete this endpoint for taking a venue_id, and using
+    # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+
+    # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+    # clicking that button delete it from the db then redirect the user to the homepage
+    return jsonify({'success': success})
+
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@ bp.route('/venues/<int:venue_id>/edit', methods=['GET'])  # done
+def edit_venue(venue_id):
+    venue = db.session.query(Venue).get(venue_id)
+    if venue is None:
+        abort(404)
+    from forms import VenueForm
+    form = VenueForm(obj=venue)
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+
+@ bp.route('/venues/<int:venue_id>/edit', methods=['POST'])  # DONE
+def edit_venue_submission(venue_id):
+
+    name = request.form['name']
+    city = request.form['city']
+    address = request.form['address']
+    state = request.form['state']
+    phone = request.form['phone']
+    genres = request.form.getlist('genres')
+    facebook_link = request.form['facebook_link']
+    image_link = request.form['image_link']
+
+    try:
+        Venue1 = db.session.query(Venue).get(venue_id)
+        Venue1.name = name
+        Venue1.city = city
+        Venue1.state = state
+        Venue1.phone = phone
+        Venue1.genres = genres
+        Venue1.facebook_link = facebook_link
+        Venue1.image_link = image_link
+        Venue1.address = address
+        db.session.commit()
+        pageCache.invalidate(*venue_cache_keys(venue_id))
+        schedule.invalidate()
+        flash("Artist successfully edited!")
+    except:
+        flash("Artist unsuccessfully edited.")
+        pass
+    # TODO: take values from the form submitted, and update existing
+    # venue record with ID <venue_id> using the new attributes
+    return redirect(url_for('.show_venue', venue_id=venue_id))
@@ -0,0 +1,56 @@
+import os
+import time
+from datetime import datetime
+
+from jinja2 import FileSystemBytecodeCache
+
+#----------------------------------------------------------------------------#
+# Worker warm-up.
+#
+# Compiled templates are kept as bytecode on disk, so a new worker only
+# unmarshals them instead of parsing and compiling every template. warm_up()
+# loads every template into the environment's cache, primes the datetime
+# filter and opens the first pool connection, so that work is done before
+# the worker takes its first request rather than during it.
+#----------------------------------------------------------------------------#
+
+TEMPLATE_EXTENSIONS = ('.html',)
+
+
+def init_template_cache(app):
+    directory = app.config.get('JINJA_CACHE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def warm_up(app, db, filters=()):
+    # Returns {step: milliseconds}
+    timings = {}
+
+    def step(name, work):
+        started = time.perf_counter()
+        work()
+        timings[name] = round((time.perf_counter() - started) * 1000, 3)
+
+    def templates():
+        env = app.jinja_env
+        names = env.list_templates(filter_func=lambda name: name.endswith(TEMPLATE_EXTENSIONS))
+        if env.cache is not None and getattr(env.cache, 'capacity', 0) < len(names):
+            env.cache.capacity = len(names)  # keep them all resident
+        for name in names:
+            env.get_template(name)
+
+    def connection():
+        with app.app_context():
+            try:
+                db.engine.connect().close()
+            except Exception as e:
+                # A database that is still starting must not stop the worker booting
+                app.logger.warning('Warm-up could not connect: %s' % e)
+
+    step('templates', templates)
+    now = datetime.now()
+    step('filters', lambda: [f(now, format) for f in filters for format in ('full', 'medium')])
+    step('database', connection)
+    return timings